@@ -0,0 +1,174 @@
+"""
+Compare the work done by ``Graph.evaluator`` searches on the graphs of the
+built-in artists.
+
+For each artist the graph used at draw time (the artist's graph composed with
+that of a ``CompatibilityAxes``) is searched for the artist's draw requirements
+with and without the A* estimate and visited state pruning.  The number of
+states expanded and the time to plan (bypassing the plans memoized by
+``evaluator``) are reported.
+
+Run with ``python benchmarks/bench_evaluator.py``.
+"""
+
+import timeit
+from unittest import mock
+
+import numpy as np
+
+from matplotlib.figure import Figure
+from matplotlib.path import Path
+
+from mpl_data_containers.artist import CompatibilityAxes
+from mpl_data_containers.containers import ArrayContainer
+from mpl_data_containers.conversion_edge import (
+    CoordinateEdge,
+    DefaultEdge,
+    FuncEdge,
+    Graph,
+)
+from mpl_data_containers.description import Desc
+from mpl_data_containers.image import Image
+from mpl_data_containers.line import Line
+from mpl_data_containers.patches import Patch
+from mpl_data_containers.text import Text
+
+
+def _cases():
+    fig = Figure()
+    nax = fig.add_subplot()
+    ax = CompatibilityAxes(nax)
+    nax.add_artist(ax)
+
+    disp = Desc(("N",), "display")
+    scalar = Desc((), "display")
+
+    x = np.linspace(0, 1, 10)
+    line = Line(ArrayContainer(x=x, y=x), color="red")
+    line_req = {
+        "x": disp,
+        "y": disp,
+        **{
+            k: scalar
+            for k in (
+                "color",
+                "linewidth",
+                "linestyle",
+                "markeredgecolor",
+                "markerfacecolor",
+                "markersize",
+                "markeredgewidth",
+                "marker",
+            )
+        },
+    }
+
+    image = Image(
+        ArrayContainer(
+            {"x": "data", "y": "data"},
+            x=np.array([0, 1]),
+            y=np.array([0, 1]),
+            image=np.random.random((5, 5)),
+        )
+    )
+    image_req = {
+        "image": Desc(("O", "P", 4), "display"),
+        "x": Desc(("X",), "display"),
+        "y": Desc(("Y",), "display"),
+    }
+
+    verts = Path.unit_rectangle()
+    patch = Patch(
+        ArrayContainer(
+            x=verts.vertices[:, 0], y=verts.vertices[:, 1], codes=verts.codes
+        )
+    )
+    patch_req = {
+        "x": disp,
+        "y": disp,
+        "codes": disp,
+        **{
+            k: scalar
+            for k in (
+                "facecolor",
+                "edgecolor",
+                "linewidth",
+                "linestyle",
+                "hatch",
+                "alpha",
+            )
+        },
+    }
+
+    text = Text(ArrayContainer(x=0.5, y=0.5, text="hello"))
+    text_req = {
+        k: Desc((), "display")
+        for k in (
+            "x",
+            "y",
+            "text",
+            "color",
+            "alpha",
+            "fontproperties",
+            "usetex",
+            "rotation",
+            "antialiased",
+        )
+    }
+
+    # Several style keys pulled into one subgraph by an edge consuming all of them,
+    # each of which may be converted or defaulted, as a larger search problem
+    keys = [f"style{i}" for i in range(6)]
+    coupled = Graph(
+        [
+            *(CoordinateEdge.from_coords(k, {k: Desc(())}, "display") for k in keys),
+            *(DefaultEdge.from_default_value(f"{k}_def", k, scalar, 0) for k in keys),
+            FuncEdge.from_func(
+                "combined",
+                lambda **kwargs: 0,
+                {k: scalar for k in keys},
+                {"combined": scalar},
+            ),
+        ]
+    )
+    coupled_input = {k: Desc(()) for k in keys[: len(keys) // 2]}
+    coupled_req = {k: scalar for k in keys}
+    yield "Coupled", coupled, coupled_input, coupled_req
+
+    for name, art, req in [
+        ("Line", line, line_req),
+        ("Image", image, image_req),
+        ("Patch", patch, patch_req),
+        ("Text", text, text_req),
+    ]:
+        yield name, ax._graph + art._graph, art._container.describe(), req
+
+
+def main():
+    modes = {
+        "uniform cost": dict(heuristic=False, prune=False),
+        "uniform cost + pruning": dict(heuristic=False, prune=True),
+        "A* + pruning": dict(heuristic=True, prune=True),
+    }
+    print(f"{'graph':<8}{'edges':>6}  {'search':<24}{'expanded':>9}{'ms/call':>10}")
+    for name, graph, input, output in _cases():
+        for mode, kwargs in modes.items():
+            expansions = 0
+            orig = Graph._search
+
+            def counting(self, *args, **kw):
+                nonlocal expansions
+                node, n = orig(self, *args, **kw, **kwargs)
+                expansions += n
+                return node, n
+
+            with mock.patch.object(Graph, "_search", counting):
+                t = timeit.timeit(lambda: graph._plan(input, output), number=1)
+            print(
+                f"{name:<8}{len(graph._edges):>6}  {mode:<24}"
+                f"{expansions:>9}{t * 1e3:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+=====================
+Rectangles from array
+=====================
+
+Draw a bar chart as a single :class:`.patches.Rectangle` artist.
+
+Each of the rectangle parameters may be given as an array with one value per
+rectangle (or as a scalar shared by all of them).  The unit square is placed by
+one affine matrix per rectangle, computed together, and all of the bars are
+drawn in a single call.
+"""
+
+import numpy as np
+
+import matplotlib.pyplot as plt
+
+from mpl_data_containers.artist import CompatibilityAxes
+from mpl_data_containers.containers import ArrayContainer
+from mpl_data_containers.patches import Rectangle
+
+rng = np.random.default_rng(19680801)
+x = np.arange(50)
+heights = rng.uniform(1, 10, x.size)
+
+cont = ArrayContainer(
+    lower_left_x=x - 0.4,
+    lower_left_y=np.zeros(x.size),
+    upper_right_x=x + 0.4,
+    upper_right_y=heights,
+)
+bars = Rectangle(cont, facecolor="C0", edgecolor="k", linewidth=0.5)
+
+fig, nax = plt.subplots()
+ax = CompatibilityAxes(nax)
+nax.add_artist(ax)
+ax.add_artist(bars)
+ax.set_xlim(-1, 50)
+ax.set_ylim(0, 11)
+
+plt.show()
@@ -0,0 +1,50 @@
+"""
+================
+Patch collection
+================
+
+Draw many polygons, with different numbers of vertices, from a single
+container using :class:`.patches.PatchCollection`.
+
+All of the vertices are concatenated, with the number of vertices of each
+polygon given by ``lengths``, so they are transformed together and drawn
+with a single call to the renderer.
+"""
+
+import numpy as np
+
+import matplotlib.pyplot as plt
+
+from mpl_data_containers.artist import CompatibilityAxes
+from mpl_data_containers.containers import ArrayContainer
+from mpl_data_containers.patches import PatchCollection
+
+rng = np.random.default_rng(19680801)
+
+n = 200
+lengths = rng.integers(3, 8, n)
+centers = rng.uniform(0, 10, (n, 2))
+radii = rng.uniform(0.1, 0.4, n)
+
+# regular polygons, each with ``lengths[i]`` vertices
+theta = np.concatenate([np.linspace(0, 2 * np.pi, k, endpoint=False) for k in lengths])
+x = np.repeat(centers[:, 0], lengths) + np.repeat(radii, lengths) * np.cos(theta)
+y = np.repeat(centers[:, 1], lengths) + np.repeat(radii, lengths) * np.sin(theta)
+
+cont = ArrayContainer(
+    x=x,
+    y=y,
+    lengths=lengths,
+    facecolor=np.array([f"C{k}" for k in lengths]),
+)
+pc = PatchCollection(cont, edgecolor="k", linewidth=0.5, alpha=0.8)
+
+fig, nax = plt.subplots()
+nax.set_aspect("equal")
+ax = CompatibilityAxes(nax)
+nax.add_artist(ax)
+ax.add_artist(pc)
+ax.set_xlim(0, 10)
+ax.set_ylim(0, 10)
+
+plt.show()
@@ -1,16 +1,51 @@
 from bisect import insort
 from collections import OrderedDict
-from typing import Sequence
+from concurrent.futures import Executor
+import itertools
+from typing import Any, Hashable, Sequence
 from contextlib import contextmanager
+import threading
+import weakref
 
 import numpy as np
 
 from matplotlib.backend_bases import PickEvent
 import matplotlib.artist as martist
+import matplotlib.transforms as mtransforms
 
 from .containers import DataContainer, ArrayContainer, DataUnion
 from .description import Desc, desc_like
-from .conversion_edge import Edge, FuncEdge, Graph, TransformEdge
+from .conversion_edge import (
+    Edge,
+    FuncEdge,
+    Graph,
+    TransformEdge,
+    evaluate_many,
+    transform_key,
+)
+
+# The number of dynamic graphs kept per cache set of an artist
+_MAX_CACHED_GRAPHS = 8
+
+# The display space pick bounds, [xmin, ymin, xmax, ymax], of what can be hit
+# anywhere and of what cannot be hit
+_PICK_ANYWHERE = np.array([-np.inf, -np.inf, np.inf, np.inf])
+_PICK_NOWHERE = np.array([np.inf, np.inf, -np.inf, -np.inf])
+
+
+def _default_clip_box() -> ArrayContainer:
+    """The clip box of artists unless set otherwise, the extent of their parent."""
+    return ArrayContainer(
+        {"x": "parent", "y": "parent"}, x=np.asarray([0, 1]), y=np.asarray([0, 1])
+    )
+
+
+# The (key, Bbox) of the default clip box of the children of each parent graph,
+# only read or written with the lock held
+_default_clip_bboxes: weakref.WeakKeyDictionary[Graph, tuple] = (
+    weakref.WeakKeyDictionary()
+)
+_default_clip_lock = threading.Lock()
 
 
 class Artist:
@@ -25,31 +60,134 @@ class Artist:
 
         self._children: list[tuple[float, Artist]] = []
         self._picker = None
+        # (key, extent) of the last `_keyed_pick_extent` and (keys, extents) of
+        # the children in the last `pick`
+        self._pick_extent_cache = None
+        self._child_extents = None
 
         edges = edges or []
         self._visible = True
         self._graph = Graph(edges)
-        self._clip_box: DataContainer = ArrayContainer(
-            {"x": "parent", "y": "parent"},
-            **{"x": np.asarray([0, 1]), "y": np.asarray([0, 1])}
-        )
+        self._clip_box: DataContainer = _default_clip_box()
+        # The default clip box and its cache key, it is resolved along with those
+        # of the siblings while it is neither replaced nor updated
+        self._default_clip = (self._clip_box, self._clip_box.query(None)[1])
 
         self._caches = {}
+        self._cache_lock = threading.Lock()
+        # bumped whenever the artist is marked stale
+        self._version = 0
+        self._stale = True
+
+    @property
+    def stale(self) -> bool:
+        """Whether the artist changed since it was last drawn.
+
+        Changes to the data, graphs and clip box are found when drawing, set this
+        after changing anything else the rendering depends on (e.g. the ``norm``
+        of an `.Image`) for cached renderings to be redrawn.
+        """
+        return self._stale
+
+    @stale.setter
+    def stale(self, val: bool) -> None:
+        if val:
+            self._version += 1
+        self._stale = val
+
+    def _draw_key(self, graph: Graph) -> tuple[tuple, tuple[dict[str, Any], Any]]:
+        """What the rendering depends on, with *graph* as passed to `draw`.
+
+        The transforms of *graph* are not included.  Returned together with the
+        ``(data, cache_key)`` query of the container it was read from, to be passed
+        on to `_prepare` when drawing the same frame.
+        """
+        g = graph + self._graph
+        queried = self._container.query(g)
+        _, clip_key = self._clip_box.query(g)
+        key = (
+            self._version,
+            g.cache_key(),
+            self._graph.transform_key(),
+            queried[1],
+            clip_key,
+        )
+        return key, queried
 
     def draw(self, renderer, graph: Graph) -> None:
+        if not self.get_visible():
+            return
+        evaluated = self._evaluate_plan(graph)
+        if evaluated is not None:
+            self._emit(renderer, graph, evaluated)
+
+    def _prepare(
+        self, graph: Graph, queried: tuple[dict[str, Any], Any] | None = None
+    ) -> list[tuple[Edge, dict[str, Any]]] | None:
+        """Query the data needed to draw, returning ``(evaluator, query)`` pairs.
+
+        Artists which implement this and `_emit` can have the evaluation of their
+        plans batched with their siblings' (see `.evaluate_many`).  ``None``
+        means there is nothing to evaluate ahead of `draw`.  *queried* is the
+        ``(data, cache_key)`` of the container if it was already queried for this
+        frame (see `_draw_key`).
+        """
+        return None
+
+    def _emit(self, renderer, graph: Graph, evaluated: list[dict[str, Any]]) -> None:
+        """Draw from the evaluated plan of `_prepare`, in the same order."""
         return
 
+    def _evaluate_plan(
+        self, graph: Graph, queried: tuple[dict[str, Any], Any] | None = None
+    ) -> list[dict[str, Any]] | None:
+        """`_prepare` and evaluate the plan, the input of `_emit` (or None)."""
+        plan = self._prepare(graph, queried)
+        if plan is None:
+            return None
+        return [edge.evaluate(inp) for edge, inp in plan]
+
     def set_clip_box(self, container: DataContainer) -> None:
         self._clip_box = container
+        self.stale = True
 
     def get_clip_box(self, container: DataContainer) -> DataContainer:
         return self._clip_box
 
+    def _get_clip_bbox(self, graph: Graph) -> mtransforms.Bbox:
+        """The display space `~.Bbox` of the clip box, with *graph* as passed to `draw`.
+
+        The default clip box is resolved once per parent graph for as long as its
+        transforms do not change, and the Bbox is shared by all of the children.
+        """
+        require = {"x": Desc(("N",), "display"), "y": Desc(("N",), "display")}
+        default, default_key = self._default_clip
+        query, q_cache_key = self._clip_box.query(graph)
+        if self._clip_box is not default or q_cache_key != default_key:
+            clipx, clipy = self._query_and_eval(
+                self._clip_box, require, graph, cacheset="clip"
+            ).values()
+            return mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
+
+        # (the default clip boxes of all artists hold the same data)
+        conv = graph.evaluator(default.describe(), require)
+        key = transform_key(conv)
+        with _default_clip_lock:
+            cached = _default_clip_bboxes.get(graph)
+        if cached is None or cached[0] != key:
+            clipx, clipy = conv.evaluate(query).values()
+            bbox = mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
+            cached = (key, bbox)
+            with _default_clip_lock:
+                _default_clip_bboxes[graph] = cached
+        return cached[1]
+
     def get_visible(self):
         return self._visible
 
     def set_visible(self, visible):
         self._visible = visible
+        self.stale = True
 
     def pickable(self) -> bool:
         return self._picker is not None
@@ -79,6 +217,58 @@ class Artist:
         """
         return False, {}
 
+    def _pick_bounds(self, graph: Graph) -> np.ndarray:
+        """The display space bounds outside of which `contains` is False.
+
+        Given as ``[xmin, ymin, xmax, ymax]``, with *graph* as passed to
+        `contains`.  By default the artist may be hit anywhere.
+        """
+        return _PICK_ANYWHERE
+
+    def _pick_key(self, graph: Graph) -> Hashable:
+        """What `_pick_bounds` depends on, given the same *graph*.
+
+        The bounds are only recomputed when this changes, by default they are
+        constant.
+        """
+        return None
+
+    def _pick_extent(self, graph: Graph | None) -> np.ndarray:
+        """The pick bounds of this artist and all of its children.
+
+        *graph* is as passed to `pick`.  Subtrees without any pickable artist
+        cannot be hit anywhere.
+        """
+        return self._keyed_pick_extent(graph)[1]
+
+    def _keyed_pick_extent(self, graph: Graph | None) -> tuple[Hashable, np.ndarray]:
+        """`_pick_extent` together with a key which changes whenever it does."""
+        g = self._graph if graph is None else graph + self._graph
+        own: Hashable = None
+        if self.pickable():
+            own = ("callable",) if callable(self.get_picker()) else (self._pick_key(g),)
+        children = [c._keyed_pick_extent(g) for c in self.get_children()]
+        key = (own, tuple(k for k, _ in children))
+        cached = self._pick_extent_cache
+        if cached is not None and cached[0] == key:
+            return cached
+        if own is None:
+            bounds = [_PICK_NOWHERE]
+        elif own == ("callable",):
+            bounds = [_PICK_ANYWHERE]
+        else:
+            bounds = [self._pick_bounds(g)]
+        if children:
+            bounds.extend(extent for _, extent in children)
+            bounds = np.array(bounds)
+            extent = np.concatenate(
+                [bounds[:, :2].min(axis=0), bounds[:, 2:].max(axis=0)]
+            )
+        else:
+            extent = bounds[0]
+        cached = self._pick_extent_cache = key, extent
+        return cached
+
     def get_children(self):
         return [a[1] for a in self._children]
 
@@ -109,8 +299,20 @@ class Artist:
                     "pick_event", mouseevent.canvas, mouseevent, self, **prop
                 )._process()
 
-        # Pick children
-        for a in self.get_children():
+        # Pick children, skipping those which cannot be hit where the event is
+        children = self.get_children()
+        if not children:
+            return
+        keyed = [a._keyed_pick_extent(graph) for a in children]
+        keys = tuple(k for k, _ in keyed)
+        cached = self._child_extents
+        if cached is None or cached[0] != keys:
+            cached = self._child_extents = keys, np.array([e for _, e in keyed])
+        extents = cached[1]
+        x, y = mouseevent.x, mouseevent.y
+        inside = (extents[:, 0] <= x) & (extents[:, 1] <= y)
+        inside &= (x <= extents[:, 2]) & (y <= extents[:, 3])
+        for a in itertools.compress(children, inside):
             # make sure the event happened in the same Axes
             ax = getattr(a, "axes", None)
             if mouseevent.inaxes is None or ax is None or mouseevent.inaxes == ax:
@@ -125,27 +327,34 @@ class Artist:
     def _get_dynamic_graph(self, query, description, graph, cacheset):
         return Graph([])
 
-    def _query_and_eval(self, container, requires, graph, cacheset=None):
-        g = graph + self._graph
-        query, q_cache_key = container.query(g)
-        g = g + self._get_dynamic_graph(query, container.describe(), graph, cacheset)
-        g_cache_key = g.cache_key()
-        cache_key = (g_cache_key, q_cache_key)
-
-        cache = None
-        if cacheset is not None:
+    def _dynamic_graph(self, query, q_cache_key, description, graph, cacheset):
+        """`_get_dynamic_graph`, memoized per query cache key and parent graph."""
+        key = (q_cache_key, graph.cache_key(), self._graph.cache_key())
+        # (the lock is not held while building, concurrent misses build twice)
+        with self._cache_lock:
             cache = self._caches.setdefault(cacheset, OrderedDict())
-            if cache_key in cache:
-                return cache[cache_key]
-
-        conv = g.evaluator(container.describe(), requires)
-        ret = conv.evaluate(query)
+            try:
+                cache.move_to_end(key)
+                return cache[key]
+            except KeyError:
+                pass
+        ret = self._get_dynamic_graph(query, description, graph, cacheset)
+        with self._cache_lock:
+            cache[key] = ret
+            while len(cache) > _MAX_CACHED_GRAPHS:
+                cache.popitem(last=False)
+        return ret
 
-        # TODO: actually add to cache and prune
-        # if cache is not None:
-        #     cache[cache_key] = ret
+    def _query_and_plan(self, container, requires, graph, cacheset=None, queried=None):
+        g = graph + self._graph
+        query, q_cache_key = queried or container.query(g)
+        description = container.describe()
+        g = g + self._dynamic_graph(query, q_cache_key, description, graph, cacheset)
+        return g.evaluator(description, requires), query
 
-        return ret
+    def _query_and_eval(self, container, requires, graph, cacheset=None):
+        conv, query = self._query_and_plan(container, requires, graph, cacheset)
+        return conv.evaluate(query)
 
 
 class CompatibilityArtist:
@@ -255,14 +464,31 @@ class CompatibilityAxes(Artist):
     Ultimately for useability, whatever remains shimmed out here may be rolled in as
     some form of gaurded option to ``Artist`` itself, but a firm dividing line is
     useful for avoiding accidental dependency.
+
+    With ``blit=True``, the children at the bottom of the zorder which did not
+    change between frames are restored from a saved canvas rather than drawn
+    again (see `Artist.stale` for changes which cannot be found).  Only the area
+    of the axes is saved and restored.  What Matplotlib draws beneath them is
+    assumed not to change unless the transforms or the size of the canvas do, set
+    the ``stale`` of the compatibility axes after changing it.
+
+    Given a `concurrent.futures.Executor`, the children query and evaluate their
+    data in it concurrently (for slow containers or conversions), while they are
+    still rendered one at a time, in order.
     """
 
-    def __init__(self, axes):
+    def __init__(self, axes, *, blit=False, executor: Executor | None = None):
         super().__init__(ArrayContainer())
         self._axes = axes
         self.figure = None
         self._clippath = None
         self.zorder = 2
+        self._blit = blit
+        self._executor = executor
+        # the (child, draw key) drawn in the last frame
+        self._last_drawn = []
+        # (frame key, (child, draw key) of the static children, canvas after them)
+        self._blit_cache = None
 
     @property
     def axes(self):
@@ -348,9 +574,95 @@ class CompatibilityAxes(Artist):
             graph = Graph([])
 
         graph = graph + self._graph
-
-        for _, c in self._children:
-            c.draw(renderer, graph)
+        children = [c for _, c in self._children if c.get_visible()]
+        if self._blit and hasattr(renderer, "copy_from_bbox"):
+            self._draw_blit(renderer, graph, children)
+        else:
+            self._draw_children(renderer, graph, children)
+
+    def _draw_children(self, renderer, graph, children, queried=None):
+        """Draw *children*, given the queries of their containers if already read."""
+        if queried is None:
+            queried = [None] * len(children)
+        if self._executor is None:
+            # Evaluate the plans of all children together so the transforms they
+            # share run once, then draw in order
+            plans = [c._prepare(graph, q) for c, q in zip(children, queried)]
+            evaluated = iter(
+                evaluate_many(
+                    [step for plan in plans if plan is not None for step in plan]
+                )
+            )
+            results = [
+                None if plan is None else [next(evaluated) for _ in plan]
+                for plan in plans
+            ]
+        else:
+            # Draw in order as the results come in
+            results = self._executor.map(
+                lambda c, q: c._evaluate_plan(graph, q), children, queried
+            )
+        for c, evaluated in zip(children, results):
+            if evaluated is None:
+                c.draw(renderer, graph)
+            else:
+                c._emit(renderer, graph, evaluated)
+            c.stale = False
+
+    def _draw_blit(self, renderer, graph, children):
+        """Draw *children*, restoring the leading ones which did not change.
+
+        The children which did not change since the previous frame are drawn
+        once more and the area of the axes is then saved.  As long as neither
+        they, the transforms nor what was drawn before them change, the saved area
+        is restored in place of drawing them.
+
+        As with Matplotlib's blitting, what is drawn before the children (e.g.
+        the axes patch and grid) is assumed not to change unless the transforms
+        or the size of the canvas do, set `stale` after changing it otherwise.
+        Only the area of the axes is saved, what the restored children draw
+        outside of it is lost.
+        """
+        region = self._axes.bbox.frozen()
+        frame_key = (
+            self._version,
+            id(renderer),
+            graph.cache_key(),
+            graph.transform_key(),
+            (renderer.width, renderer.height),
+            tuple(region.bounds),
+        )
+        if self._executor is None:
+            keyed = [c._draw_key(graph) for c in children]
+        else:
+            keyed = list(self._executor.map(lambda c: c._draw_key(graph), children))
+        drawn = [(c, key) for c, (key, _) in zip(children, keyed)]
+        queried = [q for _, q in keyed]
+
+        start = 0
+        if self._blit_cache is not None:
+            cached_frame_key, static, after = self._blit_cache
+            if cached_frame_key == frame_key and drawn[: len(static)] == static:
+                renderer.restore_region(after)
+                start = len(static)
+            else:
+                self._blit_cache = None
+
+        # Extend the static children with the next ones which did not change
+        stop = start
+        while (
+            stop < min(len(drawn), len(self._last_drawn))
+            and drawn[stop] == self._last_drawn[stop]
+        ):
+            stop += 1
+        if stop > start:
+            self._draw_children(
+                renderer, graph, children[start:stop], queried[start:stop]
+            )
+            after = renderer.copy_from_bbox(region)
+            self._blit_cache = (frame_key, drawn[:stop], after)
+        self._draw_children(renderer, graph, children[stop:], queried[stop:])
+        self._last_drawn = drawn
 
     def add_artist(self, artist, zorder=1):
         insort(self._children, (zorder, artist), key=lambda x: x[0])
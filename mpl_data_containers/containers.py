@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from typing import (
+    Hashable,
     Protocol,
     Dict,
     Tuple,
@@ -10,6 +11,10 @@ from typing import (
     Callable,
     MutableMapping,
 )
+from multiprocessing import resource_tracker, shared_memory
+import os
+import sys
+import threading
 import uuid
 
 from cachetools import LFUCache
@@ -81,11 +86,37 @@ class DataContainer(Protocol):
 class NoNewKeys(ValueError): ...
 
 
+def query_versions(
+    container: DataContainer, graph: Graph, parent_coordinates: str = "axes"
+) -> Tuple[Dict[str, Any], Union[str, int], Dict[str, Hashable]]:
+    """Query *container*, also returning a version of each entry of the data.
+
+    The version of an entry changes whenever its value may have (even when it is
+    the same object, modified in place), so that what is computed from only some
+    of the entries can be reused when others change.  Containers can give these
+    with a ``query_versions`` method of their own, otherwise the cache key is the
+    version of every entry.
+    """
+    if hasattr(container, "query_versions"):
+        return container.query_versions(graph, parent_coordinates)
+    data, cache_key = container.query(graph, parent_coordinates)
+    return data, cache_key, dict.fromkeys(data, cache_key)
+
+
 class ArrayContainer:
+    """A container of fixed arrays, replaced (all at once) by `update`.
+
+    Queries and updates may happen from several threads, a query always returns
+    the data and cache key of one update.
+    """
+
     def __init__(self, coordinates: dict[str, str] | None = None, /, **data):
         coordinates = coordinates or {}
-        self._data = data
-        self._cache_key = str(uuid.uuid4())
+        # the data, its key and the versions of the keys are swapped together,
+        # never modified in place
+        cache_key = str(uuid.uuid4())
+        self._state = (data, cache_key, dict.fromkeys(data, cache_key))
+        self._update_lock = threading.Lock()
         self._desc = {
             k: (
                 Desc(v.shape, coordinates.get(k, "auto"))
@@ -100,20 +131,210 @@ class ArrayContainer:
         graph: Graph,
         parent_coordinates: str = "axes",
     ) -> Tuple[Dict[str, Any], Union[str, int]]:
-        return dict(self._data), self._cache_key
+        data, cache_key, _ = self._state
+        return dict(data), cache_key
+
+    def query_versions(
+        self,
+        graph: Graph,
+        parent_coordinates: str = "axes",
+    ) -> Tuple[Dict[str, Any], Union[str, int], Dict[str, Hashable]]:
+        """`query`, versioning each entry by the key of the update which set it."""
+        data, cache_key, versions = self._state
+        return dict(data), cache_key, dict(versions)
 
     def describe(self) -> Dict[str, Desc]:
         return dict(self._desc)
 
     def update(self, **data):
         # TODO check that this is still consistent with desc!
-        if not all(k in self._data for k in data):
+        with self._update_lock:
+            current, _, versions = self._state
+            if not all(k in current for k in data):
+                raise NoNewKeys(
+                    f"The keys that currently exist are {set(current)}.  You "
+                    f"tried to add {set(data) - set(current)!r}."
+                )
+            cache_key = str(uuid.uuid4())
+            self._state = (
+                {**current, **data},
+                cache_key,
+                {**versions, **dict.fromkeys(data, cache_key)},
+            )
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_update_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._update_lock = threading.Lock()
+
+
+class _SharedBlock:
+    """A shared memory block, kept mapped for as long as any array views it.
+
+    Arrays are made from the block with ``np.asarray(block)`` (and views of that),
+    which keeps the block alive through their ``base``.
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self._owner = owner
+        self._buf = np.ndarray((shm.size,), np.uint8, buffer=shm.buf)
+
+    @property
+    def __array_interface__(self):
+        return {
+            "shape": (self.shm.size,),
+            "typestr": "|u1",
+            "data": (self._buf.ctypes.data, False),
+            "version": 3,
+        }
+
+    def __del__(self):
+        # the buffer must be released before the block can be closed
+        del self._buf
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _tracker_id() -> tuple[int, int] | None:
+    """Identify the resource tracker shared memory is registered with, if any.
+
+    Processes started by `multiprocessing` share the tracker of their parent,
+    holding the same pipe to it.
+    """
+    if sys.version_info >= (3, 13) or os.name != "posix":
+        return None
+    st = os.fstat(resource_tracker.getfd())
+    return st.st_dev, st.st_ino
+
+
+def _attach_shared_memory(
+    name: str, tracker: tuple[int, int] | None
+) -> shared_memory.SharedMemory:
+    """Attach to the block *name*, created in a process using *tracker*."""
+    if sys.version_info >= (3, 13):
+        # only the creating process should unlink the block
+        return shared_memory.SharedMemory(name, track=False)
+    shm = shared_memory.SharedMemory(name)
+    if tracker is not None and _tracker_id() != tracker:
+        # Attaching registered the block with another tracker, which would unlink
+        # it once this process exits
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+class SharedArrayContainer:
+    """A container of fixed arrays held in a `multiprocessing.shared_memory` block.
+
+    Pickling sends a handle to the block (and the description), so unpickled
+    copies in other processes view the same memory without copying the arrays.
+    `update` writes the new values in place, the shapes can not change, and bumps
+    a version counter kept in the block so every process agrees on the cache key.
+
+    The block is freed once the creating container (and every array it handed
+    out) is gone, it must outlive the copies in other processes.  Updates are
+    not synchronized between processes: there should be one writer, and readers
+    in other processes can see an update which is being written.
+    """
+
+    _ALIGN = 64
+
+    def __init__(self, coordinates: dict[str, str] | None = None, /, **data):
+        coordinates = coordinates or {}
+        arrays = {k: np.asarray(v) for k, v in data.items()}
+        for k, v in arrays.items():
+            if v.dtype.hasobject:
+                raise ValueError(f"{k!r} can not be shared, it has dtype {v.dtype}")
+        # the version counter comes first, then each array aligned
+        layout = {}
+        offset = self._ALIGN
+        for k, v in arrays.items():
+            layout[k] = (v.dtype.str, v.shape, offset)
+            offset += -(-v.nbytes // self._ALIGN) * self._ALIGN
+        desc = {k: Desc(v.shape, coordinates.get(k, "auto")) for k, v in arrays.items()}
+        block = _SharedBlock(shared_memory.SharedMemory(create=True, size=offset), True)
+        self._setup(block, layout, desc, _tracker_id())
+        self._version[0] = 0
+        for k, v in arrays.items():
+            self._arrays[k][...] = v
+
+    @classmethod
+    def _attach(
+        cls,
+        name: str,
+        layout: dict,
+        desc: Dict[str, Desc],
+        tracker: tuple[int, int] | None = None,
+    ):
+        self = cls.__new__(cls)
+        block = _SharedBlock(_attach_shared_memory(name, tracker), False)
+        self._setup(block, layout, desc, tracker)
+        return self
+
+    def _setup(
+        self,
+        block: _SharedBlock,
+        layout: dict,
+        desc: Dict[str, Desc],
+        tracker: tuple[int, int] | None,
+    ):
+        self._block = block
+        # the resource tracker of the creating process, see _attach_shared_memory
+        self._tracker = tracker
+        self._layout = layout
+        self._desc = desc
+        self._update_lock = threading.Lock()
+        buf = np.asarray(block)
+        self._version = np.ndarray((1,), np.int64, buffer=buf)
+        self._arrays = {
+            k: np.ndarray(shape, dtype, buffer=buf, offset=offset)
+            for k, (dtype, shape, offset) in layout.items()
+        }
+        self._views = {}
+        for k, v in self._arrays.items():
+            self._views[k] = view = v.view()
+            view.flags.writeable = False
+
+    @property
+    def name(self) -> str:
+        """The name of the shared memory block."""
+        return self._block.shm.name
+
+    def __reduce__(self):
+        return type(self)._attach, (self.name, self._layout, self._desc, self._tracker)
+
+    def query(
+        self,
+        graph: Graph,
+        parent_coordinates: str = "axes",
+    ) -> Tuple[Dict[str, Any], Union[str, int]]:
+        return dict(self._views), f"{self.name}-{self._version[0]}"
+
+    def describe(self) -> Dict[str, Desc]:
+        return dict(self._desc)
+
+    def update(self, **data):
+        if not all(k in self._arrays for k in data):
             raise NoNewKeys(
-                f"The keys that currently exist are {set(self._data)}.  You "
-                f"tried to add {set(data) - set(self._data)!r}."
+                f"The keys that currently exist are {set(self._arrays)}.  You "
+                f"tried to add {set(data) - set(self._arrays)!r}."
             )
-        self._data.update(data)
-        self._cache_key = str(uuid.uuid4())
+        with self._update_lock:
+            for k, v in data.items():
+                v = np.asarray(v)
+                if v.shape != self._arrays[k].shape:
+                    raise ValueError(
+                        f"{k!r} has shape {self._arrays[k].shape}, it can not be "
+                        f"updated with shape {v.shape}"
+                    )
+            for k, v in data.items():
+                self._arrays[k][...] = v
+            self._version[0] += 1
 
 
 class RandomContainer:
@@ -180,6 +401,7 @@ class FuncContainer:
         self._yfuncs = _split(yfuncs) if yfuncs is not None else {}
         self._xyfuncs = _split(xyfuncs) if xyfuncs is not None else {}
         self._cache: MutableMapping[Union[str, int], Any] = LFUCache(64)
+        self._cache_lock = threading.Lock()
 
     def _query_hash(self, coord_transform, size):
         # TODO find a better way to compute the hash key, this is not sentative to
@@ -228,11 +450,13 @@ class FuncContainer:
         )["y"]
 
         hash_key = str(uuid.uuid4())
-        ret = self._cache[hash_key] = dict(
+        ret = dict(
             **{k: f(x_data) for k, f in self._xfuncs.items()},
             **{k: f(y_data) for k, f in self._yfuncs.items()},
             **{k: f(x_data, y_data) for k, f in self._xyfuncs.items()},
         )
+        with self._cache_lock:
+            self._cache[hash_key] = ret
         return ret, hash_key
 
     def describe(self) -> Dict[str, Desc]:
@@ -249,6 +473,7 @@ class HistContainer:
         }
         self._full_range = (raw_data.min(), raw_data.max())
         self._cache: MutableMapping[Union[str, int], Any] = LFUCache(64)
+        self._cache_lock = threading.Lock()
 
     def query(
         self,
@@ -270,8 +495,11 @@ class HistContainer:
 
         xmin, xmax = np.clip([xmin, xmax], dmin, dmax)
         hash_key = hash((xmin, xmax))
-        if hash_key in self._cache:
-            return self._cache[hash_key], hash_key
+        # (the lock is not held while computing, concurrent misses compute twice)
+        with self._cache_lock:
+            ret = self._cache.get(hash_key)
+        if ret is not None:
+            return ret, hash_key
         # TODO this gives an artifact with high lw
         edges_in = []
         if dmin < xmin:
@@ -285,7 +513,9 @@ class HistContainer:
             bins=np.concatenate(edges_in),
             density=True,
         )
-        ret = self._cache[hash_key] = {"edges": edges, "density": density}
+        ret = {"edges": edges, "density": density}
+        with self._cache_lock:
+            self._cache[hash_key] = ret
         return ret, hash_key
 
     def describe(self) -> Dict[str, Desc]:
@@ -404,6 +634,23 @@ class DataUnion:
             cache_keys.append(cache_key)
         return ret, hash(tuple(cache_keys))
 
+    def query_versions(
+        self,
+        graph: Graph,
+        parent_coordinates: str = "axes",
+    ) -> Tuple[Dict[str, Any], Union[str, int], Dict[str, Hashable]]:
+        cache_keys = []
+        ret = {}
+        versions = {}
+        for n, data in enumerate(self._datas):
+            base, cache_key, base_versions = query_versions(
+                data, graph, parent_coordinates
+            )
+            ret.update(base)
+            cache_keys.append(cache_key)
+            versions.update({k: (n, v) for k, v in base_versions.items()})
+        return ret, hash(tuple(cache_keys)), versions
+
     def describe(self):
         return {k: v for d in self._datas for k, v in d.describe().items()}
 
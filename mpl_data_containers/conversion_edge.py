@@ -1,15 +1,27 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from typing import Callable
 from dataclasses import dataclass
-from queue import PriorityQueue
+import functools
+import heapq
+import itertools
+import threading
+import weakref
 from typing import Any
 import numpy as np
 
+from cachetools import LRUCache
+
 from mpl_data_containers.description import Desc, desc_like, ShapeSpec
 
-from matplotlib.transforms import Transform
+from matplotlib.transforms import (
+    BlendedGenericTransform,
+    CompositeGenericTransform,
+    Transform,
+    TransformNode,
+    TransformWrapper,
+)
 
 
 @dataclass
@@ -61,6 +73,17 @@ class SequenceEdge(Edge):
             input |= edge.evaluate({k: input[k] for k in edge.input})
         return {k: input[k] for k in self.output}
 
+    @functools.cached_property
+    def _transform_edges(self) -> list[TransformEdge]:
+        """The `TransformEdge` of the sequence (and nested sequences), in order."""
+        edges = []
+        for edge in self.edges:
+            if isinstance(edge, SequenceEdge):
+                edges.extend(edge._transform_edges)
+            elif isinstance(edge, TransformEdge) and edge.transform is not None:
+                edges.append(edge)
+        return edges
+
     @property
     def inverse(self) -> "SequenceEdge":
         return SequenceEdge.from_edges(
@@ -234,6 +257,390 @@ class TransformEdge(Edge):
         )
 
 
+class _TransformVersion(TransformNode):
+    """Counts the invalidations of a (non-affine) transform it is attached to.
+
+    Each instance has a unique serial, so that keys made from it are not reused
+    by a transform which happens to get the id of a collected one.
+    """
+
+    _serials = itertools.count()
+
+    def __init__(self, transform: Transform):
+        super().__init__()
+        self.serial = next(self._serials)
+        self.version = 0
+        self.set_children(transform)
+
+    def _invalidate_internal(self, level, invalidating_node):
+        self.version += 1
+
+
+# Keyed by the id of the transform, as transforms are not hashable
+_transform_versions: dict[int, _TransformVersion] = {}
+
+
+def _transform_version(trf: Transform) -> tuple[int, int]:
+    node = _transform_versions.get(id(trf))
+    if node is None:
+        node = _transform_versions[id(trf)] = _TransformVersion(trf)
+        weakref.finalize(trf, _transform_versions.pop, id(trf), None)
+    return node.serial, node.version
+
+
+def _transform_state(trf: Transform) -> Any:
+    """A hashable snapshot of what *trf* currently computes.
+
+    Matplotlib's invalidation stops at transforms which are already invalid, so
+    counting invalidations misses changes made while nothing evaluates the
+    transform (e.g. setting the limits twice between draws).  The state is read
+    from the revalidated transforms instead: the matrix of affine parts, and the
+    structure of composite and blended ones down to their non-affine leaves.
+    """
+    if trf.is_affine:
+        return trf.get_matrix().tobytes()
+    if isinstance(trf, TransformWrapper):
+        return _transform_state(trf._child)
+    if isinstance(trf, CompositeGenericTransform):
+        return (_transform_state(trf._a), _transform_state(trf._b))
+    if isinstance(trf, BlendedGenericTransform):
+        return ("blended", _transform_state(trf._x), _transform_state(trf._y))
+    # other non-affine transforms are only changed through their own parameters
+    return _transform_version(trf)
+
+
+def transform_key(edge: Edge) -> tuple[Any, ...]:
+    """A key which changes whenever a transform evaluated by *edge* changes.
+
+    Together with the cache key of the input data, this identifies the result of
+    ``edge.evaluate``, e.g. to cache what is computed from data in display space.
+    """
+    if isinstance(edge, SequenceEdge):
+        edges = edge._transform_edges
+    elif isinstance(edge, TransformEdge) and edge.transform is not None:
+        edges = [edge]
+    else:
+        return ()
+    # (callable rather than isinstance Callable, this is on the pick path)
+    return tuple(
+        _transform_state(e.transform() if callable(e.transform) else e.transform)
+        for e in edges
+    )
+
+
+def _evaluate_steps(edge: Edge, input: dict[str, Any]):
+    """Evaluate *edge* as a generator, yielding at each `TransformEdge`.
+
+    The ``(edge, input)`` of each transform is yielded and its output must be
+    sent back, the return value is that of ``edge.evaluate(input)``.
+    """
+    if isinstance(edge, SequenceEdge):
+        for e in edge.edges:
+            e_input = {k: input[k] for k in e.input}
+            if isinstance(e, (SequenceEdge, TransformEdge)):
+                input |= yield from _evaluate_steps(e, e_input)
+            else:
+                input |= e.evaluate(e_input)
+        return {k: input[k] for k in edge.output}
+    if isinstance(edge, TransformEdge) and edge.transform is not None:
+        return (yield edge, input)
+    return edge.evaluate(input)
+
+
+# Inputs with more points than this are transformed on their own, as copying
+# them into a batch costs more than the call it saves
+_MAX_BATCHED = 4096
+
+
+def _transform_many(
+    edge: TransformEdge, inputs: list[dict[str, Any]]
+) -> list[dict[str, Any]]:
+    """``[edge.evaluate(input) for input in inputs]`` with one call to the transform."""
+    if len(inputs) == 1 or not edge.input:
+        return [edge.evaluate(input) for input in inputs]
+    keys = list(edge.input)
+    batch = []
+    for i, input in enumerate(inputs):
+        shape = np.shape(input[keys[0]])
+        if len(shape) > 1 or any(np.shape(input[k]) != shape for k in keys[1:]):
+            # Not a plain list of points, leave it to the transform
+            return [edge.evaluate(input) for input in inputs]
+        if not shape or shape[0] <= _MAX_BATCHED:
+            # scalars are recorded as None, to be unpacked again
+            batch.append((i, shape[0] if shape else None))
+    if len(batch) < 2:
+        return [edge.evaluate(input) for input in inputs]
+
+    batched = {i for i, _ in batch}
+    ret = [
+        None if i in batched else edge.evaluate(input) for i, input in enumerate(inputs)
+    ]
+
+    if isinstance(edge.transform, Callable):
+        trf = edge.transform()
+    else:
+        trf = edge.transform
+    inp = np.stack(
+        [np.concatenate([np.ravel(inputs[i][k]) for i, _ in batch]) for k in keys],
+        axis=-1,
+    )
+    outp = trf.transform(inp)
+
+    start = 0
+    for i, size in batch:
+        if size is None:
+            ret[i] = {k: outp[start, j] for j, k in enumerate(edge.output)}
+            start += 1
+        else:
+            part = outp[start : start + size]
+            ret[i] = {k: part[:, j] for j, k in enumerate(edge.output)}
+            start += size
+    return ret
+
+
+def evaluate_many(plans: Sequence[tuple[Edge, dict[str, Any]]]) -> list[dict[str, Any]]:
+    """Evaluate each ``(edge, input)`` of *plans*, as ``edge.evaluate(input)``.
+
+    The evaluations advance in lockstep, and whenever several of them reach a
+    `TransformEdge` with the same transform (and keys), it is applied once to
+    all of their inputs concatenated.  For plans sharing the transforms of a
+    parent graph, such as the children of an axes, this saves the overhead of
+    transforming many small arrays one at a time.
+    """
+    results: list[dict[str, Any]] = [{}] * len(plans)
+    pending = []
+
+    def advance(i, steps, value):
+        try:
+            edge, input = steps.send(value)
+        except StopIteration as stop:
+            results[i] = stop.value
+        else:
+            pending.append((i, steps, edge, input))
+
+    for i, (edge, input) in enumerate(plans):
+        advance(i, _evaluate_steps(edge, input), None)
+
+    while pending:
+        batches: dict[tuple, list] = {}
+        for step in pending:
+            edge = step[2]
+            key = (id(edge.transform), tuple(edge.input), tuple(edge.output))
+            batches.setdefault(key, []).append(step)
+        pending = []
+        for batch in batches.values():
+            outputs = _transform_many(batch[0][2], [input for *_, input in batch])
+            for (i, steps, *_), output in zip(batch, outputs):
+                advance(i, steps, output)
+    return results
+
+
+# The number of partial paths reported by ``NoPathFound``
+_N_PARTIAL = 3
+
+
+class NoPathFound(NotImplementedError):
+    """No path through a `Graph` gives the requested outputs.
+
+    Raised by `Graph.evaluator` with what the search found: ``unmet`` are the
+    output keys left unresolved by the closest path, ``frontier`` the descriptions
+    reached from ``input`` and ``partial`` the names of the edges of the closest
+    paths, fewest unmet keys first.  Nothing is drawn unless `visualize` is called.
+    """
+
+    def __init__(
+        self,
+        msg: str,
+        graph: Graph | None,
+        input: dict[str, Desc],
+        output: dict[str, Desc],
+        unmet: Iterable[str],
+        frontier: Sequence[dict[str, Desc]] = (),
+        partial: Sequence[Sequence[str]] = (),
+    ):
+        super().__init__(msg)
+        self.graph = graph
+        self.input = input
+        self.output = output
+        self.unmet = set(unmet)
+        self.frontier = list(frontier)
+        self.partial = [list(p) for p in partial]
+
+    def __reduce__(self):
+        # The graph is left behind, its edges may not be picklable
+        return (
+            type(self),
+            (
+                self.args[0],
+                None,
+                self.input,
+                self.output,
+                self.unmet,
+                self.frontier,
+                self.partial,
+            ),
+        )
+
+    def visualize(self):
+        """Draw the graph, and the states reachable from the input."""
+        if self.graph is None:
+            raise RuntimeError("The graph is not available to visualize")
+        self.graph.visualize(self.input)
+        self.graph.visualize()
+
+
+@dataclass
+class _Node:
+    """A search state of ``Graph.evaluator``."""
+
+    weight: float
+    desc: dict[str, Desc]
+    prev_node: _Node | None = None
+    edge: Edge | None = None
+    # bitmask of the positions (in ``_EdgeIndex.edges``) of the edges on the path
+    used: int = 0
+
+    @property
+    def edges(self):
+        if self.prev_node is None:
+            return [self.edge]
+        return self.prev_node.edges + [self.edge]
+
+
+# The number of entries kept in each of the tables of an ``_EdgeIndex`` filled
+# while searching, requests differ in the shapes of the data
+_MAX_ROUTES = 1024
+
+
+class _EdgeIndex:
+    """Lookup tables for searching one subgraph of a ``Graph``.
+
+    ``edges`` are the subgraph's edges sorted by weight, other tables refer to
+    edges by position in that list.  ``consumers`` maps ``(key, coordinates)``
+    (with aliases resolved) to the edges which take that as an input and
+    ``sources`` are the edges taking no input at all.  Keys are assigned bits in
+    ``key_bits`` and ``in_masks``/``out_masks`` are the keys each edge consumes
+    and produces.  ``routes_from`` and ``routes`` are the routing tables of
+    ``Graph._route``, filled as needed and holding the ``_MAX_ROUTES`` most
+    recently used entries.  They (and ``useful``) are only read or written with
+    ``lock`` held.
+    """
+
+    __slots__ = (
+        "edges",
+        "consumers",
+        "sources",
+        "key_bits",
+        "in_masks",
+        "out_masks",
+        "routes_from",
+        "routes",
+        "_useful",
+        "lock",
+    )
+
+    def __init__(self, edges: Sequence[Edge], resolve_alias: Callable[[str], str]):
+        self.edges = sorted(edges, key=lambda x: x.weight)
+        self.consumers: dict[tuple[str, str], list[int]] = {}
+        self.sources: list[int] = []
+        self.key_bits: dict[str, int] = {}
+        self.in_masks: list[int] = []
+        self.out_masks: list[int] = []
+        self.routes_from: LRUCache[
+            Desc | None, list[tuple[float, Desc, tuple[Edge, ...]]]
+        ] = LRUCache(_MAX_ROUTES)
+        self.routes: LRUCache[tuple[Desc | None, Desc], tuple[Edge, ...] | None] = (
+            LRUCache(_MAX_ROUTES)
+        )
+        self._useful: LRUCache[frozenset[str], list[bool]] = LRUCache(_MAX_ROUTES)
+        self.lock = threading.Lock()
+        for i, e in enumerate(self.edges):
+            if not e.input:
+                self.sources.append(i)
+            for k, v in e.input.items():
+                self.consumers.setdefault((k, resolve_alias(v.coordinates)), []).append(
+                    i
+                )
+            self.in_masks.append(self.mask(e.input))
+            self.out_masks.append(self.mask(e.output))
+
+    def mask(self, keys: Iterable[str]) -> int:
+        ret = 0
+        for k in keys:
+            if (bit := self.key_bits.get(k)) is None:
+                bit = self.key_bits[k] = 1 << len(self.key_bits)
+            ret |= bit
+        return ret
+
+    def useful(self, output: Iterable[str]) -> list[bool]:
+        """Which edges can advance the search for *output*.
+
+        These are the edges producing any of *output*, or (transitively) any of
+        the inputs of such an edge.
+        """
+        output = frozenset(output)
+        with self.lock:
+            try:
+                return self._useful[output]
+            except KeyError:
+                pass
+        # (keys not in the subgraph cannot be produced by any edge)
+        relevant = 0
+        for k in output:
+            relevant |= self.key_bits.get(k, 0)
+        changed = True
+        while changed:
+            changed = False
+            for in_mask, out_mask in zip(self.in_masks, self.out_masks):
+                if out_mask & relevant and in_mask & ~relevant:
+                    relevant |= in_mask
+                    changed = True
+        ret = [bool(m & relevant) for m in self.out_masks]
+        with self.lock:
+            self._useful[output] = ret
+        return ret
+
+
+class _DisjointSet:
+    """Union-find over the keys of a ``Graph``, with path compression."""
+
+    __slots__ = ("_parent", "_size")
+
+    def __init__(self):
+        self._parent: dict[str, str] = {}
+        self._size: dict[str, int] = {}
+
+    def add(self, key: str) -> None:
+        if key not in self._parent:
+            self._parent[key] = key
+            self._size[key] = 1
+
+    def find(self, key: str) -> str:
+        root = key
+        while (parent := self._parent[root]) != root:
+            root = parent
+        while key != root:
+            self._parent[key], key = root, self._parent[key]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        self.add(b)
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self._size[a] < self._size[b]:
+            a, b = b, a
+        self._parent[b] = a
+        self._size[a] += self._size[b]
+
+
+# Source of ``Graph.cache_key``
+_graph_keys = itertools.count()
+
+# The number of plans kept per graph, requests differ in the shapes of the data
+_MAX_EVALUATORS = 256
+
+
 class Graph:
     def __init__(
         self, edges: Sequence[Edge], aliases: tuple[tuple[str, str], ...] = ()
@@ -241,113 +648,302 @@ class Graph:
         self._edges = tuple(edges)
         self._aliases = aliases
 
-        self._subgraphs: list[tuple[set[str], list[Edge]]] = []
+        sets = _DisjointSet()
         for edge in self._edges:
-            keys = set(edge.input) | set(edge.output)
+            first, *rest = [*edge.input, *edge.output] or [None]
+            if first is None:
+                continue
+            sets.add(first)
+            for k in rest:
+                sets.union(first, k)
 
-            overlapping = []
+        # Subgraphs are ordered by their first edge, edges in the order given
+        groups: dict[str, tuple[set[str], list[Edge]]] = {}
+        subgraphs: list[tuple[set[str], list[Edge]]] = []
+        for edge in self._edges:
+            keys = set(edge.input) | set(edge.output)
+            if not keys:
+                subgraphs.append((keys, [edge]))
+                continue
+            root = sets.find(next(iter(keys)))
+            if (group := groups.get(root)) is None:
+                group = groups[root] = (set(), [])
+                subgraphs.append(group)
+            group[0].update(keys)
+            group[1].append(edge)
+
+        self._init_subgraphs(
+            [(frozenset(keys), tuple(edges)) for keys, edges in subgraphs]
+        )
 
-            for n, (sub_keys, sub_edges) in enumerate(self._subgraphs):
-                if keys & sub_keys:
-                    overlapping.append(n)
+    def _init_subgraphs(
+        self, subgraphs: list[tuple[frozenset[str], tuple[Edge, ...]]]
+    ) -> None:
+        # Subgraphs are never modified, so they are shared (along with their lookup
+        # tables) by the graphs composed from this one, see ``__add__``
+        self._subgraphs = subgraphs
+        self._cache_key = next(_graph_keys)
+        # Position in ``_subgraphs`` of the subgraph holding each key
+        self._key_subgraph = {
+            k: n for n, (keys, _) in enumerate(subgraphs) for k in keys
+        }
+        self._resolved_aliases: dict[str, str] = {}
+        # Guards the tables below, which are filled as the graph is used.  It is
+        # only held to read or store an entry, concurrent misses both compute it
+        self._lock = threading.Lock()
+        # Lazily built per-subgraph lookup tables keyed on the subgraph's keys, see
+        # ``_edge_index``
+        self._edge_indices: dict[frozenset[str], _EdgeIndex] = {}
+        # Plans already returned by ``evaluator``, the most recently used
+        self._evaluators: LRUCache[tuple, Edge] = LRUCache(_MAX_EVALUATORS)
+        # Graphs composed with this one on the right, see ``__add__``
+        self._sums: weakref.WeakKeyDictionary[Graph, Graph] = (
+            weakref.WeakKeyDictionary()
+        )
 
-            if not overlapping:
-                self._subgraphs.append((keys, [edge]))
-            elif len(overlapping) == 1:
-                s = self._subgraphs[overlapping[0]][0]
-                s |= keys
-                self._subgraphs[overlapping[0]][1].append(edge)
-            else:
-                edges_combined = [edge]
-                for n in overlapping:
-                    keys |= self._subgraphs[n][0]
-                    edges_combined.extend(self._subgraphs[n][1])
-                for n in overlapping[::-1]:
-                    self._subgraphs.pop(n)
-                self._subgraphs.append((keys, edges_combined))
+    def _edge_index(self, n: int) -> _EdgeIndex:
+        sub_keys, sub_edges = self._subgraphs[n]
+        with self._lock:
+            try:
+                return self._edge_indices[sub_keys]
+            except KeyError:
+                pass
+        ret = _EdgeIndex(sub_edges, self._resolve_alias)
+        with self._lock:
+            # keep the first one stored, its tables may already be filled
+            return self._edge_indices.setdefault(sub_keys, ret)
 
     def _resolve_alias(self, coord: str) -> str:
+        try:
+            return self._resolved_aliases[coord]
+        except KeyError:
+            pass
+        resolved = coord
         while True:
             for coa, cob in self._aliases:
-                if coord == coa:
-                    coord = cob
+                if resolved == coa:
+                    resolved = cob
                     break
             else:
                 break
-        return coord
+        self._resolved_aliases[coord] = resolved
+        return resolved
 
-    def evaluator(self, input: dict[str, Desc], output: dict[str, Desc]) -> Edge:
-        out_edges = []
+    def _search(
+        self,
+        input: dict[str, Desc],
+        output: dict[str, Desc],
+        n_sub: int,
+        *,
+        heuristic: bool = True,
+        prune: bool = True,
+        explored: list[_Node] | None = None,
+    ) -> tuple[_Node | None, int]:
+        """Find the cheapest path within subgraph *n_sub* from *input* to *output*.
+
+        This is an A* search.  The estimate of the remaining cost counts each output
+        key not yet in the requested coordinates at the minimum weight of an edge
+        which could produce it (only edges not consuming it, if it is absent), shared
+        between all of the output keys that edge produces.
+        This never overestimates, so the first goal state popped is optimal.
+
+        States are identified by the (alias resolved) descriptions of the
+        subgraph's keys, and a state is only pushed if it is cheaper than every
+        previous way of reaching it.  Edges which cannot contribute to *output*,
+        which are already on the path, or which would not change anything are
+        skipped without checking compatibility.
+
+        Returns the goal node (``None`` if there is no path) and the number of
+        states expanded.  *heuristic* and *prune* exist to benchmark (and test) the
+        search, without *prune* only the edges which would not change anything are
+        skipped (so the search may not end if there is no path).  If *explored* is
+        given the expanded nodes are appended to it.
+        """
+        sub_keys = self._subgraphs[n_sub][0]
+        index = self._edge_index(n_sub)
+        sub_edges = index.edges
+        useful = index.useful(output)
+
+        target = {k: self._resolve_alias(v.coordinates) for k, v in output.items()}
+        # Lower bounds on the cost of fixing up a key which is present in the wrong
+        # coordinates, or of introducing one which is absent
+        convert_cost = dict.fromkeys(target, 0.0)
+        introduce_cost = dict.fromkeys(target, 0.0)
+        if heuristic:
+            convert_cost = dict.fromkeys(target, np.inf)
+            introduce_cost = dict.fromkeys(target, np.inf)
+            for e in sub_edges:
+                produced = e.output.keys() & target.keys()
+                for k in produced:
+                    share = max(e.weight, 0) / len(produced)
+                    convert_cost[k] = min(convert_cost[k], share)
+                    if k not in e.input:
+                        introduce_cost[k] = min(introduce_cost[k], share)
+
+        def estimate(desc: dict[str, Desc]) -> float:
+            cost = 0.0
+            for k, coord in target.items():
+                v = desc.get(k)
+                if v is None:
+                    cost += introduce_cost[k]
+                elif self._resolve_alias(v.coordinates) != coord:
+                    cost += convert_cost[k]
+            return cost
+
+        def state(desc: dict[str, Desc]) -> frozenset | None:
+            if not prune:
+                return None
+            return frozenset(
+                (k, v.shape, self._resolve_alias(v.coordinates))
+                for k in sub_keys
+                if (v := desc.get(k)) is not None
+            )
 
-        for sub_keys, sub_edges in self._subgraphs:
-            if not (sub_keys & set(output) or sub_keys & set(input)):
+        # Entries are (estimated total, estimate, insertion order, node, state), so
+        # ties are broken towards the states closest to the goal, then in insertion
+        # order
+        counter = itertools.count()
+        h = estimate(input)
+        n_state = state(input)
+        q = [(h, h, next(counter), _Node(0, input), n_state)]
+        best_weight = {n_state: 0.0}
+        expansions = 0
+        while q:
+            *_, n, n_state = heapq.heappop(q)
+            if prune and n.weight > best_weight[n_state]:
+                # superseded by a cheaper path to the same state
                 continue
-
-            output_subset = {k: v for k, v in output.items() if k in sub_keys}
-            sub_edges = sorted(sub_edges, key=lambda x: x.weight)
-
-            @dataclass
-            class Node:
-                weight: float
-                desc: dict[str, Desc]
-                prev_node: Node | None = None
-                edge: Edge | None = None
-
-                def __le__(self, other):
-                    return self.weight <= other.weight
-
-                def __lt__(self, other):
-                    return self.weight < other.weight
-
-                def __ge__(self, other):
-                    return self.weight >= other.weight
-
-                def __gt__(self, other):
-                    return self.weight > other.weight
-
-                @property
-                def edges(self):
-                    if self.prev_node is None:
-                        return [self.edge]
-                    return self.prev_node.edges + [self.edge]
-
-            q: PriorityQueue[Node] = PriorityQueue()
-            q.put(Node(0, input))
-
-            best: Node = Node(np.inf, {})
-            while not q.empty():
-                n = q.get()
-                if n.weight > best.weight:
+            if Desc.compatible(n.desc, output, aliases=self._aliases):
+                return n, expansions
+            expansions += 1
+            if explored is not None:
+                explored.append(n)
+            # Only edges consuming some (key, coordinates) present can apply
+            candidates = set(index.sources)
+            for k in sub_keys:
+                if (v := n.desc.get(k)) is not None:
+                    candidates.update(
+                        index.consumers.get((k, self._resolve_alias(v.coordinates)), ())
+                    )
+            for i in sorted(candidates):
+                if prune and (not useful[i] or n.used >> i & 1):
+                    continue
+                e = sub_edges[i]
+                if all(n.desc.get(k) is v for k, v in e.output.items()):
                     continue
-                if Desc.compatible(n.desc, output_subset, aliases=self._aliases):
-                    if n.weight < best.weight:
-                        best = n
+                if Desc.compatible(n.desc, e.input, aliases=self._aliases):
+                    d = n.desc | e.output
+                    w = n.weight + e.weight
+                    if np.isinf(h := estimate(d)):
+                        # some requested key can no longer be produced
+                        continue
+                    d_state = state(d)
+                    if prune:
+                        if best_weight.get(d_state, np.inf) <= w:
+                            continue
+                        best_weight[d_state] = w
+                    heapq.heappush(
+                        q,
+                        (
+                            w + h,
+                            h,
+                            next(counter),
+                            _Node(w, d, n, e, n.used | 1 << i),
+                            d_state,
+                        ),
+                    )
+        return None, expansions
+
+    def _route(
+        self, n_sub: int, source: Desc | None, target: Desc
+    ) -> tuple[Edge, ...] | None:
+        """The cheapest edges taking the only key of subgraph *n_sub* to *target*.
+
+        *source* is the description of the key in the input, or ``None`` if it is
+        absent.  For each source, the cheapest path to every description the key
+        can reach is computed once (edges within such a subgraph only ever see the
+        one key, so this is a plain shortest path problem) and kept as a table
+        ordered by weight. A target is then resolved to the first (cheapest)
+        compatible entry of that table.
+
+        Returns ``None`` if *target* is not reachable.
+        """
+        (key,) = self._subgraphs[n_sub][0]
+        index = self._edge_index(n_sub)
+        with index.lock:
+            try:
+                return index.routes[(source, target)]
+            except KeyError:
+                pass
+            table = index.routes_from.get(source)
+
+        if table is None:
+            table = []
+            counter = itertools.count()
+            q: list[tuple[float, int, Desc | None, tuple[Edge, ...]]] = [
+                (0, next(counter), source, ())
+            ]
+            settled: set[Desc | None] = set()
+            while q:
+                w, _, d, path = heapq.heappop(q)
+                if d in settled:
                     continue
-                for e in sub_edges:
-                    if e in n.edges:
+                settled.add(d)
+                if d is not None:
+                    table.append((w, d, path))
+                current = {} if d is None else {key: d}
+                for e in index.edges:
+                    if e.output[key] in settled:
                         continue
-                    if Desc.compatible(n.desc, e.input, aliases=self._aliases):
-                        d = n.desc | e.output
-                        w = n.weight + e.weight
+                    if Desc.compatible(current, e.input, aliases=self._aliases):
+                        heapq.heappush(
+                            q, (w + e.weight, next(counter), e.output[key], path + (e,))
+                        )
+            with index.lock:
+                index.routes_from[source] = table
+
+        route = None
+        for _, d, path in table:
+            if Desc.compatible({key: d}, {key: target}, aliases=self._aliases):
+                route = path
+                break
+        with index.lock:
+            index.routes[(source, target)] = route
+        return route
+
+    def evaluator(self, input: dict[str, Desc], output: dict[str, Desc]) -> Edge:
+        # The graph never changes, so neither does the plan for the same request
+        key = (tuple(input.items()), tuple(output.items()))
+        with self._lock:
+            try:
+                return self._evaluators[key]
+            except KeyError:
+                pass
+        ret = self._plan(input, output)
+        with self._lock:
+            self._evaluators[key] = ret
+        return ret
+
+    def _plan(self, input: dict[str, Desc], output: dict[str, Desc]) -> Edge:
+        out_edges = []
+
+        relevant = {self._key_subgraph[k] for k in output if k in self._key_subgraph}
+        for n_sub in sorted(relevant):
+            sub_keys = self._subgraphs[n_sub][0]
+            output_subset = {k: v for k, v in output.items() if k in sub_keys}
 
-                        q.put(Node(w, d, n, e))
-            if np.isinf(best.weight):
+            edges: Sequence[Edge] | None
+            if len(sub_keys) == 1:
+                # No coupling between keys, the path comes from the routing table
+                (key,) = sub_keys
+                edges = self._route(n_sub, input.get(key), output_subset[key])
+            else:
+                best = self._search(input, output_subset, n_sub)[0]
+                edges = None if best is None else best.edges[1:]
+            if edges is None:
                 # TODO: case where non-linear solving is needed
-                # this plotting is in here for debugging purposes, it should be removed at some point
-                import matplotlib.pyplot as plt
-
-                self.visualize(input)
-                self.visualize()
-                plt.show()
-                raise NotImplementedError(
-                    "This may be possible, but is not a simple case already considered"
-                )
+                raise self._no_path(input, output_subset, n_sub)
 
-            edges = []
-            n = best
-            while n.prev_node is not None:
-                edges.insert(0, n.edge)
-                n = n.prev_node
             if len(edges) == 0:
                 continue
             elif len(edges) == 1:
@@ -359,11 +955,14 @@ class Graph:
         for out in out_edges:
             found_outputs |= set(out.output)
         if missing := set(output) - found_outputs:
-            import matplotlib.pyplot as plt
-
-            self.visualize(input)
-            plt.show()
-            raise RuntimeError(f"Could not find path to resolve all outputs: {missing}")
+            raise NoPathFound(
+                f"Could not find path to resolve all outputs: {missing}",
+                self,
+                input,
+                output,
+                missing,
+                [input],
+            )
 
         if len(out_edges) == 0:
             return Edge("noop", input, output)
@@ -371,6 +970,39 @@ class Graph:
             return out_edges[0]
         return SequenceEdge.from_edges("eval", out_edges, output)
 
+    def _no_path(
+        self, input: dict[str, Desc], output: dict[str, Desc], n_sub: int
+    ) -> NoPathFound:
+        """Describe how close the search of subgraph *n_sub* came to *output*."""
+        explored: list[_Node] = []
+        self._search(input, output, n_sub, heuristic=False, explored=explored)
+
+        def unmet(desc):
+            return frozenset(
+                k
+                for k, v in output.items()
+                if k not in desc
+                or not Desc.compatible({k: desc[k]}, {k: v}, aliases=self._aliases)
+            )
+
+        closest = sorted(
+            ((len(unmet(n.desc)), n.weight, i) for i, n in enumerate(explored))
+        )[:_N_PARTIAL]
+        partial = [
+            [e.name for e in explored[i].edges if e is not None] for *_, i in closest
+        ]
+        left = unmet(explored[closest[0][-1]].desc) if closest else unmet(input)
+        return NoPathFound(
+            f"Could not find path to resolve all outputs: {set(left)}, "
+            f"closest paths found: {partial}",
+            self,
+            input,
+            output,
+            left,
+            [n.desc for n in explored],
+            partial,
+        )
+
     def visualize(self, input: dict[str, Desc] | None = None):
         if input is None:
             from .introspection import draw_graph
@@ -425,19 +1057,86 @@ class Graph:
         # plt.show()
 
     def __add__(self, other: Graph) -> Graph:
+        """Compose two graphs, *other*'s aliases taking precedence.
+
+        Composing with an empty graph returns the other operand.  Otherwise the
+        subgraphs of both operands are shared by reference, only those which have
+        keys in common are merged.  The result is cached on *self* (weakly keyed on
+        *other*), graphs are never modified so the same operands give the same
+        result.
+        """
+        if not other._edges and not other._aliases:
+            return self
+        if not self._edges and not self._aliases:
+            return other
+        with self._lock:
+            try:
+                return self._sums[other]
+            except KeyError:
+                pass
+
         aself = {k: v for k, v in self._aliases}
         aother = {k: v for k, v in other._aliases}
         aliases = tuple((aself | aother).items())
-        return Graph(self._edges + other._edges, aliases)
+
+        subgraphs: list[tuple[frozenset[str], tuple[Edge, ...]] | None] = list(
+            self._subgraphs
+        )
+        owner = dict(self._key_subgraph)
+        for keys, edges in other._subgraphs:
+            overlapping = sorted({owner[k] for k in keys if k in owner})
+            if not overlapping:
+                n = len(subgraphs)
+                subgraphs.append((keys, edges))
+            else:
+                merged = [subgraphs[m] for m in overlapping]
+                keys = keys.union(*(k for k, _ in merged))
+                edges = tuple(itertools.chain(*(e for _, e in merged), edges))
+                for m in overlapping:
+                    subgraphs[m] = None
+                n = overlapping[0]
+                subgraphs[n] = (keys, edges)
+            for k in keys:
+                owner[k] = n
+
+        ret = Graph.__new__(Graph)
+        ret._edges = self._edges + other._edges
+        ret._aliases = aliases
+        ret._init_subgraphs([s for s in subgraphs if s is not None])
+        # The lookup tables of unmerged subgraphs stay valid if aliases are the same
+        shared = {id(sg) for sg in ret._subgraphs}
+        for g in (self, other):
+            if g._aliases != aliases:
+                continue
+            with g._lock:
+                indices = dict(g._edge_indices)
+            for sg in g._subgraphs:
+                index = indices.get(sg[0])
+                if index is not None and id(sg) in shared:
+                    ret._edge_indices[sg[0]] = index
+
+        with self._lock:
+            # the same sum for every caller, its cache key identifies it
+            return self._sums.setdefault(other, ret)
+
+    def __reduce__(self):
+        # Lookup tables and cached sums are rebuilt as needed
+        return (type(self), (self._edges, self._aliases))
 
     def cache_key(self):
         """A cache key representing the graph.
 
-        Current implementation is a new UUID, that is to say uncachable.
+        Graphs are never modified, so this identifies the instance (it is unique for
+        the life of the process).
         """
-        import uuid
+        return self._cache_key
+
+    def transform_key(self) -> tuple[Any, ...]:
+        """`transform_key` of all of the edges of the graph.
 
-        return str(uuid.uuid4())
+        Unlike `cache_key`, this changes when a transform of the graph changes.
+        """
+        return tuple(k for edge in self._edges for k in transform_key(edge))
 
 
 def coord_and_default(
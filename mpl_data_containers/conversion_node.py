@@ -1,9 +1,10 @@
 from __future__ import annotations
 
-from collections.abc import Iterable, Callable, Sequence
+from collections.abc import Iterable, Callable, Hashable, Sequence
 from collections import Counter
 from dataclasses import dataclass
 import inspect
+import threading
 from functools import cached_property
 
 from typing import Any
@@ -14,10 +15,7 @@ def evaluate_pipeline(
     input: dict[str, Any],
     delayed_converters: dict[str, Callable] | None = None,
 ):
-    for node in nodes:
-        if isinstance(node, Callable):
-            k = list(inspect.signature(node).parameters.keys())[0]
-            node = FunctionConversionNode.from_funcs({k: node})
+    for node in map(_resolve_node, nodes):
         if isinstance(node, DelayedConversionNode):
             input = node.evaluate(input, delayed_converters)
         else:
@@ -147,3 +145,211 @@ class DelayedConversionNode(ConversionNode):
                 },
             }
         )
+
+
+def _resolve_node(node: ConversionNode | Callable) -> ConversionNode:
+    if isinstance(node, Callable):
+        k = list(inspect.signature(node).parameters.keys())[0]
+        node = FunctionConversionNode.from_funcs({k: node})
+    return node
+
+
+# The functions of the steps taking the delayed converters as their first argument
+def _delayed(converter_key: str) -> Callable:
+    def convert(converters, value):
+        return converters[converter_key](value)
+
+    return convert
+
+
+def _opaque(node: ConversionNode, keys: tuple[str, ...]) -> Callable:
+    if isinstance(node, DelayedConversionNode):
+
+        def evaluate(converters, *values):
+            return node.evaluate(dict(zip(keys, values)), converters)
+
+    else:
+
+        def evaluate(converters, *values):
+            return node.evaluate(dict(zip(keys, values)))
+
+    return evaluate
+
+
+def _getitem(key: str) -> Callable:
+    def getitem(converters, result):
+        return result[key]
+
+    return getitem
+
+
+@dataclass
+class _Step:
+    out: int
+    func: Callable
+    args: tuple[int, ...]
+    kwargs: tuple[tuple[str, int], ...]
+    # whether func takes the delayed converters first
+    converters: bool
+    # slots no longer needed once the step is done
+    release: tuple[int, ...] = ()
+    # whether to reuse the output while the versions of the inputs are the same,
+    # and the (input versions, output, output version) of the last call
+    memoize: bool = False
+    last: tuple[tuple[Any, ...], Any, Any] | None = None
+
+
+class CompiledPipeline:
+    """A pipeline of conversion nodes compiled for a fixed set of input keys.
+
+    Created by `compile_pipeline`, which does the bookkeeping of the nodes (which
+    keys are read, renamed, trimmed or never used) once, so that evaluating is a
+    flat sequence of calls on slots.  The result is the same as that of
+    `evaluate_pipeline`, except that the functions computing keys which are
+    dropped before the end are never called.
+
+    Given the *versions* of the input keys (see `.query_versions`), the functions
+    of `FunctionConversionNode` are memoized on the versions of their inputs:
+    while these are the same as in the previous evaluation (e.g. for the arrays
+    of an `.ArrayContainer` which were not updated) the previous output is
+    reused, and keeps its version for the following functions.  Without a
+    version an input is assumed to have changed.  The memoized functions should
+    only depend on their inputs.
+    """
+
+    def __init__(
+        self,
+        input_keys: tuple[str, ...],
+        loads: tuple[tuple[int, str], ...],
+        steps: tuple[_Step, ...],
+        output: tuple[tuple[str, int], ...],
+        n_slots: int,
+    ):
+        self.input_keys = input_keys
+        self._loads = loads
+        self._steps = steps
+        self._output = output
+        self._n_slots = n_slots
+        # guards the memos of the steps
+        self._memo_lock = threading.Lock()
+
+    def evaluate(
+        self,
+        input: dict[str, Any],
+        delayed_converters: dict[str, Callable] | None = None,
+        versions: dict[str, Hashable] | None = None,
+    ) -> dict[str, Any]:
+        versions = versions or {}
+        slots: list[Any] = [None] * self._n_slots
+        # the version of each slot, a new object() for what is not known
+        slot_versions: list[Any] = [None] * self._n_slots
+        for i, k in self._loads:
+            slots[i] = input[k]
+            version = versions.get(k)
+            slot_versions[i] = object() if version is None else version
+        for step in self._steps:
+            if step.memoize:
+                inputs = tuple([slot_versions[i] for _, i in step.kwargs])
+                with self._memo_lock:
+                    last = step.last
+                if last is not None and last[0] == inputs:
+                    _, out, version = last
+                else:
+                    out = step.func(**{name: slots[i] for name, i in step.kwargs})
+                    version = object()
+                    with self._memo_lock:
+                        step.last = (inputs, out, version)
+            else:
+                args = [slots[i] for i in step.args]
+                out = step.func(
+                    *([delayed_converters, *args] if step.converters else args),
+                    **{name: slots[i] for name, i in step.kwargs},
+                )
+                # (e.g. unit conversions which had nothing to do)
+                if len(args) == 1 and out is args[0]:
+                    version = slot_versions[step.args[0]]
+                else:
+                    version = object()
+            slots[step.out] = out
+            slot_versions[step.out] = version
+            for i in step.release:
+                slots[i] = None
+        return {k: slots[i] for k, i in self._output}
+
+
+def compile_pipeline(
+    nodes: Sequence[ConversionNode | Callable], input_keys: Iterable[str]
+) -> CompiledPipeline:
+    """Compile *nodes* (as passed to `evaluate_pipeline`) for *input_keys*."""
+    input_keys = tuple(input_keys)
+    # the slot of each key, in the order of the keys of the evaluated dict
+    keys: dict[str, int] = {k: i for i, k in enumerate(input_keys)}
+    n_slots = len(keys)
+    steps: list[_Step] = []
+
+    def add_step(func, args=(), kwargs=(), converters=True, memoize=False):
+        nonlocal n_slots
+        steps.append(
+            _Step(
+                n_slots,
+                func,
+                tuple(args),
+                tuple(kwargs),
+                converters,
+                memoize=memoize,
+            )
+        )
+        n_slots += 1
+        return n_slots - 1
+
+    for node in map(_resolve_node, nodes):
+        node.preview_keys(keys)
+        if type(node) is FunctionConversionNode:
+            new = {
+                k: add_step(
+                    func,
+                    kwargs=((p, keys[p]) for p in sig.parameters),
+                    converters=False,
+                    memoize=True,
+                )
+                for k, (func, sig) in node._sigs.items()
+            }
+        elif type(node) is RenameConversionNode:
+            new = {out: keys[inp] for inp, out in node.mapping.items()}
+        elif type(node) is DelayedConversionNode:
+            new = {
+                k: add_step(_delayed(node.converter_key), args=(keys[k],))
+                for k in node.required_keys
+            }
+        elif type(node) is LimitKeysConversionNode:
+            keys = {k: i for k, i in keys.items() if k in node.keys}
+            continue
+        elif type(node) is ConversionNode:
+            new = {}
+        else:
+            result = add_step(_opaque(node, tuple(keys)), args=keys.values())
+            new = {
+                k: add_step(_getitem(k), args=(result,))
+                for k in node.preview_keys(keys)
+            }
+        if node.trim_keys:
+            keys = {k: new[k] if k in new else keys[k] for k in node.output_keys}
+        else:
+            if missing_keys := set(node.output_keys) - set(keys) - set(new):
+                raise ValueError(f"Missing keys: {missing_keys}")
+            keys = {**keys, **new}
+
+    # only keep the steps computing what is used, and release what is not
+    # needed anymore as early as possible
+    output = tuple(keys.items())
+    live = set(keys.values())
+    kept = []
+    for step in reversed(steps):
+        if step.out not in live:
+            continue
+        used = {*step.args, *(i for _, i in step.kwargs)}
+        step.release = tuple(sorted(used - live))
+        live |= used
+        kept.append(step)
+    loads = tuple((i, k) for i, k in enumerate(input_keys) if i in live)
+    return CompiledPipeline(input_keys, loads, tuple(reversed(kept)), output, n_slots)
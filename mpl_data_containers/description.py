@@ -1,11 +1,115 @@
 from dataclasses import dataclass
 from typing import TypeAlias, Tuple, Union, overload
+import weakref
 
 
 ShapeSpec: TypeAlias = Tuple[Union[str, int], ...]
 
+# A parsed shape component: either an exact size or a ``(variable, offset)`` pair
+_CompiledDim: TypeAlias = Union[int, Tuple[str, int]]
 
-@dataclass(frozen=True)
+# Bound on the number of distinct shapes/checks remembered, each table is reset
+# when it is full (the checks also with the shapes they are keyed on)
+_MAX_SHAPE_CACHE = 4096
+
+
+class _CompiledShape:
+    """A shape spec parsed once into exact sizes and ``(variable, offset)`` pairs.
+
+    Instances are interned by ``_compile_shape`` and hash by identity so that they
+    can be used as cheap keys for the compatibility memo table.
+    """
+
+    __slots__ = ("shape", "dims")
+
+    def __init__(self, shape: ShapeSpec):
+        self.shape = shape
+        self.dims: tuple[_CompiledDim, ...] = tuple(
+            (comp[0], int(comp[1:] or 0)) if isinstance(comp, str) else comp
+            for comp in shape
+        )
+
+
+_compiled_shapes: dict[ShapeSpec, _CompiledShape] = {}
+_shape_checks: dict[tuple, tuple[type[Exception], str] | None] = {}
+
+
+def _compile_shape(shape: ShapeSpec) -> _CompiledShape:
+    try:
+        return _compiled_shapes[shape]
+    except KeyError:
+        pass
+    except TypeError:
+        # e.g. shapes given as lists
+        return _compile_shape(tuple(shape))
+    if len(_compiled_shapes) >= _MAX_SHAPE_CACHE:
+        _compiled_shapes.clear()
+        _shape_checks.clear()
+    compiled = _compiled_shapes[shape] = _CompiledShape(shape)
+    return compiled
+
+
+def _check_shapes(
+    fieldnames: tuple[str, ...],
+    specs: tuple[_CompiledShape, ...],
+    descs: tuple[_CompiledShape, ...],
+    broadcast: bool,
+) -> tuple[type[Exception], str] | None:
+    """Check compiled shapes, returning the exception to raise (if any)."""
+    specvars: dict[str, _CompiledDim] = {}
+    for fieldname, spec, desc in zip(fieldnames, specs, descs):
+        if not broadcast:
+            if len(spec.dims) != len(desc.dims):
+                return (
+                    ValueError,
+                    f"{fieldname!r} shape {desc.shape} incompatible with "
+                    f"specification {spec.shape}.",
+                )
+        elif len(desc.dims) > len(spec.dims):
+            return (
+                ValueError,
+                f"{fieldname!r} shape {desc.shape} incompatible with specification "
+                f"{spec.shape}.",
+            )
+        for speccomp, desccomp in zip(spec.dims[::-1], desc.dims[::-1]):
+            if broadcast and desccomp == 1:
+                continue
+            if isinstance(speccomp, tuple):
+                specv, specoff = speccomp
+
+                if isinstance(desccomp, tuple):
+                    entry: _CompiledDim = (desccomp[0], desccomp[1] - specoff)
+                else:
+                    entry = desccomp - specoff
+
+                if specv in specvars and entry != specvars[specv]:
+                    return ValueError, f"Found two incompatible values for {specv!r}"
+
+                specvars[specv] = entry
+            elif speccomp != desccomp:
+                return (
+                    ValueError,
+                    f"{fieldname!r} shape {desc.shape} incompatible with "
+                    f"specification {spec.shape}",
+                )
+    return None
+
+
+def _resolve_alias(coord: str, aliases: tuple[tuple[str, str], ...]) -> str:
+    while True:
+        for coa, cob in aliases:
+            if coord == coa:
+                coord = cob
+                break
+        else:
+            break
+    return coord
+
+
+_interned_descs: weakref.WeakValueDictionary = weakref.WeakValueDictionary()
+
+
+@dataclass(frozen=True, init=False)
 class Desc:
     # TODO: sort out how to actually spell this.  We need to know:
     #   - what the number of dimensions is (1d vs 2d vs ...)
@@ -16,6 +120,35 @@ class Desc:
     shape: ShapeSpec
     coordinates: str = "auto"
 
+    # Instances are interned: constructing an equal ``Desc`` returns the existing
+    # object, so equality and hashing (which the graph search does a lot of) are
+    # usually resolved by identity.
+    def __new__(cls, shape: ShapeSpec, coordinates: str = "auto") -> "Desc":
+        shape = tuple(shape)
+        key = (cls, shape, coordinates)
+        try:
+            return _interned_descs[key]
+        except KeyError:
+            pass
+        self = super().__new__(cls)
+        object.__setattr__(self, "shape", shape)
+        object.__setattr__(self, "coordinates", coordinates)
+        object.__setattr__(self, "_hash", hash((shape, coordinates)))
+        return _interned_descs.setdefault(key, self)
+
+    def __reduce__(self):
+        return type(self), (self.shape, self.coordinates)
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.shape, self.coordinates) == (other.shape, other.coordinates)
+
     @staticmethod
     def validate_shapes(
         specification: dict[str, ShapeSpec | "Desc"],
@@ -56,50 +189,30 @@ class Desc:
         ValueError:
             If shapes are incompatible in any other way
         """
-        specvars: dict[str, int | tuple[str, int]] = {}
-        for fieldname in specification:
+        fieldnames = tuple(specification)
+        specs = []
+        descs = []
+        for fieldname in fieldnames:
             spec = specification[fieldname]
             if fieldname not in actual:
                 raise KeyError(
                     f"Actual is missing {fieldname!r}, required by specification."
                 )
             desc = actual[fieldname]
-            if isinstance(spec, Desc):
-                spec = spec.shape
-            if isinstance(desc, Desc):
-                desc = desc.shape
-            if not broadcast:
-                if len(spec) != len(desc):
-                    raise ValueError(
-                        f"{fieldname!r} shape {desc} incompatible with specification "
-                        f"{spec}."
-                    )
-            elif len(desc) > len(spec):
-                raise ValueError(
-                    f"{fieldname!r} shape {desc} incompatible with specification "
-                    f"{spec}."
-                )
-            for speccomp, desccomp in zip(spec[::-1], desc[::-1]):
-                if broadcast and desccomp == 1:
-                    continue
-                if isinstance(speccomp, str):
-                    specv, specoff = speccomp[0], int(speccomp[1:] or 0)
-
-                    if isinstance(desccomp, str):
-                        descv, descoff = desccomp[0], int(desccomp[1:] or 0)
-                        entry = (descv, descoff - specoff)
-                    else:
-                        entry = desccomp - specoff
-
-                    if specv in specvars and entry != specvars[specv]:
-                        raise ValueError(f"Found two incompatible values for {specv!r}")
-
-                    specvars[specv] = entry
-                elif speccomp != desccomp:
-                    raise ValueError(
-                        f"{fieldname!r} shape {desc} incompatible with specification "
-                        f"{spec}"
-                    )
+            specs.append(_compile_shape(spec.shape if isinstance(spec, Desc) else spec))
+            descs.append(_compile_shape(desc.shape if isinstance(desc, Desc) else desc))
+
+        # Shapes are interned, so the memo is keyed on their identities
+        key = (fieldnames, tuple(specs), tuple(descs), broadcast)
+        try:
+            err = _shape_checks[key]
+        except KeyError:
+            if len(_shape_checks) >= _MAX_SHAPE_CACHE:
+                _shape_checks.clear()
+            err = _shape_checks[key] = _check_shapes(*key)
+        if err is not None:
+            exc, msg = err
+            raise exc(msg)
         return None
 
     @staticmethod
@@ -112,23 +225,16 @@ class Desc:
 
         Note: ``a`` _may_ have additional keys.
         """
-
-        def resolve_aliases(coord):
-            while True:
-                for coa, cob in aliases:
-                    if coord == coa:
-                        coord = cob
-                        break
-                else:
-                    break
-            return coord
-
         try:
             Desc.validate_shapes(b, a)
         except (KeyError, ValueError):
             return False
         for k, v in b.items():
-            if resolve_aliases(a[k].coordinates) != resolve_aliases(v.coordinates):
+            if a[k].coordinates == v.coordinates:
+                continue
+            if _resolve_alias(a[k].coordinates, aliases) != _resolve_alias(
+                v.coordinates, aliases
+            ):
                 return False
         return True
 
@@ -2,7 +2,6 @@ import numpy as np
 
 import matplotlib as mpl
 import matplotlib.colors as mcolors
-import matplotlib.transforms as mtransforms
 
 from .artist import Artist
 from .description import Desc, desc_like
@@ -89,9 +88,7 @@ class Image(Artist):
 
         self._graph = self._graph + Graph(edges, (("data", "data_resampled"),))
 
-    def draw(self, renderer, graph: Graph) -> None:
-        if not self.get_visible():
-            return
+    def _prepare(self, graph: Graph, queried=None):
         g = graph + self._graph
         conv = g.evaluator(
             self._container.describe(),
@@ -101,23 +98,17 @@ class Image(Artist):
                 "y": Desc(("Y",), "display"),
             },
         )
-        query, _ = self._container.query(g)
-        evald = conv.evaluate(query)
+        query, _ = queried or self._container.query(g)
+        return [(conv, query)]
+
+    def _emit(self, renderer, graph, evaluated):
+        (evald,) = evaluated
         image = evald["image"]
         x = evald["x"]
         y = evald["y"]
 
-        clip_conv = g.evaluator(
-            self._clip_box.describe(),
-            {"x": Desc(("N",), "display"), "y": Desc(("N",), "display")},
-        )
-        clip_query, _ = self._clip_box.query(g)
-        clipx, clipy = clip_conv.evaluate(clip_query).values()
-
         gc = renderer.new_gc()
-        gc.set_clip_rectangle(
-            mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
-        )
+        gc.set_clip_rectangle(self._get_clip_bbox(graph))
         renderer.draw_image(gc, x[0], y[0], image)  # TODO vector backend transforms
 
     def contains(self, mouseevent, graph=None):
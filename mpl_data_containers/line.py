@@ -1,3 +1,5 @@
+import functools
+
 import matplotlib.path as mpath
 import matplotlib.colors as mcolors
 import matplotlib.lines as mlines
@@ -7,11 +9,170 @@ import numpy as np
 
 from .artist import Artist
 from .description import Desc
-from .conversion_edge import Graph, CoordinateEdge, DefaultEdge
+from .conversion_edge import Graph, CoordinateEdge, DefaultEdge, transform_key
 
 segment_hits = mlines.segment_hits
 
 
+@functools.lru_cache(maxsize=128)
+def _dash_pattern(linestyle, linewidth):
+    """The dash offset and pattern of *linestyle*, scaled to *linewidth*.
+
+    The pattern is returned as a tuple, the result being shared by all callers.
+    """
+    offset, dashes = mlines._scale_dashes(
+        *mlines._get_dash_pattern(linestyle), linewidth
+    )
+    return offset, None if dashes is None else tuple(dashes)
+
+
+@functools.lru_cache(maxsize=128)
+def _marker_stamp(marker, size):
+    """The path of *marker* and its transform, scaled to *size* pixels."""
+    marker_ = mmarkers.MarkerStyle(marker)
+    return marker_.get_path(), marker_.get_transform().scale(size).frozen()
+
+
+def _screen_path(path, clip):
+    """Reduce the display space *path* to the part that is visible in *clip*.
+
+    The path is clipped to the *clip* Bbox and points on the same pixel and
+    collinear runs are merged (as Agg would do while rendering).  Clipping
+    moves the start of the visible segments, so it must not be used for
+    dashed strokes.
+    """
+    path = path.cleaned(remove_nans=True, clip=clip.extents, simplify=True)
+    # already simplified, do not let the renderer do it again
+    path.should_simplify = False
+    return path
+
+
+def _cached(func, *args):
+    """Call the ``lru_cache`` wrapped *func*, bypassing the cache if needed.
+
+    Scalar arrays are unwrapped, other unhashable arguments (e.g. markers given
+    as paths) are computed every time.
+    """
+    args = tuple(
+        a.item() if isinstance(a, np.ndarray) and a.ndim == 0 else a for a in args
+    )
+    try:
+        hash(args)
+    except TypeError:
+        return func.__wrapped__(*args)
+    return func(*args)
+
+
+class _GridIndex:
+    """The boxes ``[xmin, xmax] x [ymin, ymax]`` filed under the cells of a grid.
+
+    Boxes covering at most 2x2 cells are found by a binary search on the cell of
+    the queried position, larger boxes are always returned as candidates and
+    those with non-finite bounds never are.
+    """
+
+    def __init__(self, xmin, xmax, ymin, ymax, cell):
+        self._size = cell
+        ids = np.arange(len(xmin))
+        cells, owners = [], []
+        with np.errstate(invalid="ignore", over="ignore"):
+            ix0, ix1 = np.floor(xmin / cell), np.floor(xmax / cell)
+            iy0, iy1 = np.floor(ymin / cell), np.floor(ymax / cell)
+            finite = np.isfinite(ix0 + ix1 + iy0 + iy1)
+            small = finite & (ix1 - ix0 <= 1) & (iy1 - iy0 <= 1)
+            for dx in (0, 1):
+                for dy in (0, 1):
+                    # the cells past the top right of a box are not in its range
+                    m = small & (ix0 + dx <= ix1) & (iy0 + dy <= iy1)
+                    cells.append(self._cell_id(ix0[m] + dx, iy0[m] + dy))
+                    owners.append(ids[m])
+        self._large = ids[finite & ~small]
+        cells = np.concatenate(cells)
+        order = np.argsort(cells, kind="stable")
+        self._cells = cells[order]
+        self._owners = np.concatenate(owners)[order]
+
+    @staticmethod
+    def _cell_id(ix, iy):
+        # far away cells are merged on the edges of the (2**32)**2 grid
+        ix = np.clip(ix, -(2**31), 2**31 - 1).astype(np.int64)
+        iy = np.clip(iy, -(2**31), 2**31 - 1).astype(np.int64)
+        return ix * 2**32 + iy
+
+    def query(self, x, y):
+        """The sorted indices of the boxes which may contain ``(x, y)``."""
+        cell = self._cell_id(np.floor(x / self._size), np.floor(y / self._size))
+        lo = np.searchsorted(self._cells, cell, "left")
+        hi = np.searchsorted(self._cells, cell, "right")
+        return np.sort(np.concatenate([self._owners[lo:hi], self._large]))
+
+
+class _HitIndex:
+    """The display space points of a line, indexed to find those near a position.
+
+    `hits` gives the same indices as ``segment_hits(cx, cy, x, y, radius)``, or
+    the points within *radius* if *segments* is False, after testing only the
+    points and segments filed around ``(cx, cy)``.  ``bounds`` is the
+    ``[xmin, ymin, xmax, ymax]`` outside of which nothing is hit.
+    """
+
+    def __init__(self, x, y, radius, segments=True):
+        self.x = x = np.asarray(x, dtype=float)
+        self.y = y = np.asarray(y, dtype=float)
+        self.radius = radius
+        self.segments = segments and len(x) > 1
+        finite = np.isfinite(x) & np.isfinite(y)
+        if finite.any():
+            self.bounds = np.array(
+                [
+                    x[finite].min() - radius,
+                    y[finite].min() - radius,
+                    x[finite].max() + radius,
+                    y[finite].max() + radius,
+                ]
+            )
+        else:
+            self.bounds = np.array([np.inf, np.inf, -np.inf, -np.inf])
+        # the grids are only built once needed
+        self._points = self._segments = None
+
+    def _index(self):
+        x, y, radius = self.x, self.y, self.radius
+        cell = 4 * radius
+        if self.segments:
+            x0, x1, y0, y1 = x[:-1], x[1:], y[:-1], y[1:]
+            self._segments = _GridIndex(
+                np.minimum(x0, x1) - radius,
+                np.maximum(x0, x1) + radius,
+                np.minimum(y0, y1) - radius,
+                np.maximum(y0, y1) + radius,
+                cell,
+            )
+        # last, as it marks the index as built
+        self._points = _GridIndex(x - radius, x + radius, y - radius, y + radius, cell)
+
+    def hits(self, cx, cy):
+        if self._points is None:
+            self._index()
+        x, y, r2 = self.x, self.y, self.radius**2
+        with np.errstate(all="ignore"):
+            points = self._points.query(cx, cy)
+            points = points[(cx - x[points]) ** 2 + (cy - y[points]) ** 2 <= r2]
+            if not self.segments:
+                return points
+            # as in segment_hits, for the candidate segments only
+            seg = self._segments.query(cx, cy)
+            xr, yr = x[seg], y[seg]
+            dx, dy = x[seg + 1] - xr, y[seg + 1] - yr
+            u = ((cx - xr) * dx + (cy - yr) * dy) / (dx**2 + dy**2)
+            start_hits = (cx - xr) ** 2 + (cy - yr) ** 2 <= r2
+            end_hits = (cx - x[seg + 1]) ** 2 + (cy - y[seg + 1]) ** 2 <= r2
+            candidates = (u >= 0) & (u <= 1) & ~(start_hits | end_hits)
+            px, py = xr + u * dx, yr + u * dy
+            line_hits = candidates & ((cx - px) ** 2 + (cy - py) ** 2 <= r2)
+        return np.concatenate((points, seg[line_hits]))
+
+
 class Line(Artist):
     def __init__(self, container, edges=None, **kwargs):
         super().__init__(container, edges, **kwargs)
@@ -46,6 +207,8 @@ class Line(Artist):
             DefaultEdge.from_default_value("marker_def", "marker", scalar, "None"),
         ]
         self._graph = self._graph + Graph(default_edges)
+        # (key, _HitIndex) of the last call to contains
+        self._hit_index = None
         # Currently ignoring:
         # - cap/join style
         # - url
@@ -86,6 +249,21 @@ class Line(Artist):
         if graph is None:
             return False, {}
 
+        ind = self._get_hit_index(graph).hits(mouseevent.x, mouseevent.y)
+        # if self._drawstyle.startswith("steps"):
+        #    ind //= 2
+
+        # Return the point(s) within radius
+        return len(ind) > 0, dict(ind=ind)
+
+    def _pick_bounds(self, graph):
+        return self._get_hit_index(graph).bounds
+
+    def _pick_key(self, graph):
+        return self._hit_key(graph)[0]
+
+    def _hit_key(self, graph):
+        """The key of the `_HitIndex` for *graph*, with the conversion and query."""
         g = graph + self._graph
         desc = Desc(("N",), "display")
         scalar = Desc((), "display")  # ... this needs thinking...
@@ -96,34 +274,28 @@ class Line(Artist):
             "linestyle": scalar,
         }
         conv = g.evaluator(self._container.describe(), require)
-        query, _ = self._container.query(g)
-        xt, yt, linestyle = conv.evaluate(query).values()
+        query, q_cache_key = self._container.query(g)
 
         # Convert pick radius from points to pixels
         pixels = 5  # self._pickradius # TODO
 
-        # The math involved in checking for containment (here and inside of
-        # segment_hits) assumes that it is OK to overflow, so temporarily set
-        # the error flags accordingly.
-        with np.errstate(all="ignore"):
-            # Check for collision
-            if linestyle in ["None", None]:
-                # If no line, return the nearby point(s)
-                (ind,) = np.nonzero(
-                    (xt - mouseevent.x) ** 2 + (yt - mouseevent.y) ** 2 <= pixels**2
-                )
-            else:
-                # If line, return the nearby segment(s)
-                ind = segment_hits(mouseevent.x, mouseevent.y, xt, yt, pixels)
-                # if self._drawstyle.startswith("steps"):
-                #    ind //= 2
+        # The display space points are indexed once for as long as neither the
+        # data nor the transforms change
+        key = (q_cache_key, g.cache_key(), transform_key(conv), pixels)
+        return key, conv, query
 
-        # Return the point(s) within radius
-        return len(ind) > 0, dict(ind=ind)
+    def _get_hit_index(self, graph):
+        key, conv, query = self._hit_key(graph)
+        cached = self._hit_index
+        if cached is None or cached[0] != key:
+            *_, pixels = key
+            xt, yt, linestyle = conv.evaluate(query).values()
+            # If no line, only the points can be hit
+            segments = linestyle not in ["None", None]
+            cached = self._hit_index = key, _HitIndex(xt, yt, pixels, segments)
+        return cached[1]
 
-    def draw(self, renderer, graph: Graph) -> None:
-        if not self.get_visible():
-            return
+    def _prepare(self, graph: Graph, queried=None):
         g = graph + self._graph
         desc = Desc(("N",), "display")
         scalar = Desc((), "display")  # ... this needs thinking...
@@ -142,42 +314,42 @@ class Line(Artist):
         }
 
         conv = g.evaluator(self._container.describe(), require)
-        query, _ = self._container.query(g)
-        x, y, color, lw, ls, *marker = conv.evaluate(query).values()
-        mec, mfc, ms, mew, mark = marker
+        query, _ = queried or self._container.query(g)
+        return [(conv, query)]
 
-        clip_conv = g.evaluator(
-            self._clip_box.describe(),
-            {"x": Desc(("N",), "display"), "y": Desc(("N",), "display")},
-        )
-        clip_query, _ = self._clip_box.query(g)
-        clipx, clipy = clip_conv.evaluate(clip_query).values()
+    def _emit(self, renderer, graph, evaluated):
+        (evald,) = evaluated
+        x, y, color, lw, ls, *marker = evald.values()
+        mec, mfc, ms, mew, mark = marker
 
         # make the Path object
         path = mpath.Path(np.vstack([x, y]).T)
+        clip = self._get_clip_bbox(graph)
         # make an configure the graphic context
         gc = renderer.new_gc()
-        gc.set_clip_rectangle(
-            mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
-        )
+        gc.set_clip_rectangle(clip)
         gc.set_foreground(color)
         gc.set_linewidth(lw)
-        gc.set_dashes(*mlines._scale_dashes(*mlines._get_dash_pattern(ls), lw))
+        offset, dashes = _cached(_dash_pattern, ls, lw)
+        gc.set_dashes(offset, dashes)
+        stroke = path
+        if path.should_simplify and dashes is None:
+            # only draw what can be seen, the markers still get every point
+            # (pad the clip so the caps and joins at the edges are unchanged)
+            pad = renderer.points_to_pixels(lw) + 1
+            stroke = _screen_path(path, clip.padded(pad))
         # add the line to the render buffer
-        renderer.draw_path(gc, path, mtransforms.IdentityTransform())
+        renderer.draw_path(gc, stroke, mtransforms.IdentityTransform())
 
         if mark != "None" and ms > 0:
+            # a fresh context, none of the line's styles apply to the markers
             gc = renderer.new_gc()
-            gc.set_clip_rectangle(
-                mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
-            )
+            gc.set_clip_rectangle(clip)
             gc.set_linewidth(mew)
             gc.set_foreground(mec)
-            marker_ = mmarkers.MarkerStyle(mark)
-            marker_path = marker_.get_path()
-            marker_trans = marker_.get_transform()
-            w = renderer.points_to_pixels(ms)
-            marker_trans = marker_trans.scale(w)
+            marker_path, marker_trans = _cached(
+                _marker_stamp, mark, renderer.points_to_pixels(ms)
+            )
             mfc = mcolors.to_rgba(mfc)
             renderer.draw_markers(
                 gc,
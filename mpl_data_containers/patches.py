@@ -1,16 +1,25 @@
+import functools
+from typing import Any, Sequence
+
 from matplotlib.patches import Patch as _Patch, Rectangle as _Rectangle
 import matplotlib.path as mpath
 import matplotlib.transforms as mtransforms
 import matplotlib.colors as mcolors
+import matplotlib.lines as mlines
 import numpy as np
 
-
 from .wrappers import ProxyWrapper, _stale_wrapper
 
 from .artist import Artist, _renderer_group
 from .description import Desc, desc_like
 from .containers import DataContainer
-from .conversion_edge import Graph, CoordinateEdge, DefaultEdge, TransformEdge
+from .conversion_edge import (
+    CoordinateEdge,
+    DefaultEdge,
+    Edge,
+    FuncEdge,
+    Graph,
+)
 
 
 class Patch(Artist):
@@ -38,12 +47,14 @@ class Patch(Artist):
             DefaultEdge.from_default_value("linestyle_def", "linestyle", scalar, "-"),
             DefaultEdge.from_default_value("alpha_def", "alpha", scalar, 1),
             DefaultEdge.from_default_value("hatch_def", "hatch", scalar, None),
+            # a single path unless the shape is placed several times
+            DefaultEdge.from_default_value(
+                "lengths_def", "lengths", Desc(("P",), "display"), None
+            ),
         ]
         self._graph = self._graph + Graph(def_edges)
 
-    def draw(self, renderer, graph: Graph) -> None:
-        if not self.get_visible():
-            return
+    def _prepare(self, graph: Graph, queried=None):
         desc = Desc(("N",), "display")
         scalar = Desc((), "display")  # ... this needs thinking...
 
@@ -51,6 +62,7 @@ class Patch(Artist):
             "x": desc,
             "y": desc,
             "codes": desc,
+            "lengths": Desc(("P",), "display"),
             "facecolor": scalar,
             "edgecolor": scalar,
             "linewidth": scalar,
@@ -58,27 +70,41 @@ class Patch(Artist):
             "hatch": scalar,
             "alpha": scalar,
         }
+        return [
+            self._query_and_plan(
+                self._container, require, graph, cacheset="default", queried=queried
+            )
+        ]
 
-        evald = self._query_and_eval(
-            self._container, require, graph, cacheset="default"
-        )
-
-        clip_req = {"x": Desc(("N",), "display"), "y": Desc(("N",), "display")}
-        clipx, clipy = self._query_and_eval(
-            self._clip_box, clip_req, graph, cacheset="clip"
-        ).values()
-
-        path = mpath.Path._fast_from_codes_and_verts(
-            verts=np.vstack([evald["x"], evald["y"]]).T, codes=evald["codes"]
-        )
+    def _emit(self, renderer, graph, evaluated):
+        (evald,) = evaluated
+
+        verts = np.vstack([evald["x"], evald["y"]]).T
+        lengths = evald["lengths"]
+        if lengths is None or len(lengths) == 1:
+            paths = [
+                mpath.Path._fast_from_codes_and_verts(verts=verts, codes=evald["codes"])
+            ]
+        else:
+            # Copies of a shape are filled separately, so that overlapping copies
+            # of opposite winding do not cancel out
+            bounds = np.cumsum(np.asarray(lengths, dtype=np.intp))[:-1]
+            codes = evald["codes"]
+            codes = (
+                [None] * len(lengths)
+                if codes is None
+                else np.split(np.asarray(codes), bounds)
+            )
+            paths = [
+                mpath.Path._fast_from_codes_and_verts(verts=v, codes=c)
+                for v, c in zip(np.split(verts, bounds), codes)
+            ]
 
         with _renderer_group(renderer, "patch", None):
             gc = renderer.new_gc()
 
             gc.set_foreground(evald["edgecolor"], isRGBA=False)
-            gc.set_clip_rectangle(
-                mtransforms.Bbox.from_extents(clipx[0], clipy[0], clipx[1], clipy[1])
-            )
+            gc.set_clip_rectangle(self._get_clip_bbox(graph))
             gc.set_linewidth(evald["linewidth"])
             # gc.set_dashes(*self._dash_pattern)
             # gc.set_capstyle(self._capstyle)
@@ -102,11 +128,158 @@ class Patch(Artist):
             #    from matplotlib.patheffects import PathEffectRenderer
             #    renderer = PathEffectRenderer(self.get_path_effects(), renderer)
 
-            renderer.draw_path(
+            facecolor = mcolors.to_rgba(evald["facecolor"])
+            if len(paths) == 1:
+                renderer.draw_path(
+                    gc, paths[0], mtransforms.IdentityTransform(), facecolor
+                )
+            else:
+                renderer.draw_path_collection(
+                    gc,
+                    mtransforms.IdentityTransform(),
+                    paths,
+                    np.empty((0, 3, 3)),
+                    np.zeros((1, 2)),
+                    mtransforms.IdentityTransform(),
+                    # (the alpha of the context does not apply to collections)
+                    [mcolors.to_rgba(facecolor, evald["alpha"])],
+                    [mcolors.to_rgba(evald["edgecolor"], evald["alpha"])],
+                    [evald["linewidth"]],
+                    [gc.get_dashes()],
+                    [True],
+                    [None],
+                    "screen",
+                )
+            gc.restore()
+
+
+def _each_path(key: str, default: Any) -> list[Edge]:
+    """Edges giving a per-path *key* from a scalar (or a default)."""
+    scalar = Desc((), "display")
+    return [
+        CoordinateEdge.from_coords(key, {key: Desc(())}, "display"),
+        CoordinateEdge.from_coords(f"{key}_paths", {key: Desc(("P",))}, "display"),
+        FuncEdge.from_func(
+            f"{key}_each",
+            lambda lengths, **kwargs: [kwargs[key]] * len(lengths),
+            {key: scalar, "lengths": Desc(("P",), "display")},
+            {key: Desc(("P",), "display")},
+        ),
+        DefaultEdge.from_default_value(f"{key}_def", key, scalar, default),
+    ]
+
+
+def _each_path_rgba(key: str) -> Edge:
+    """An edge taking the per-path colors *key* given as a ``(P, 4)`` RGBA array."""
+    return FuncEdge.from_func(
+        f"{key}_rgba",
+        lambda **kwargs: list(np.asarray(kwargs[key], dtype=float)),
+        {key: Desc(("P", 4))},
+        {key: Desc(("P",), "display")},
+    )
+
+
+class PatchCollection(Artist):
+    """Many paths drawn with a single ``draw_path_collection`` call.
+
+    The vertices (``x``, ``y`` and optionally ``codes``) of all of the paths are
+    concatenated, with ``lengths`` the number of vertices in each.  The face and
+    edge colors and line widths may be given per path or as scalars, the colors
+    per path also as a ``(P, 4)`` RGBA array.
+    """
+
+    def __init__(self, container, edges=None, **kwargs):
+        super().__init__(container, edges, **kwargs)
+
+        scalar = Desc((), "display")
+        def_edges = [
+            CoordinateEdge.from_coords("xycoords", {"x": "auto", "y": "auto"}, "data"),
+            CoordinateEdge.from_coords("codes", {"codes": "auto"}, "display"),
+            CoordinateEdge.from_coords("lengths", {"lengths": Desc(("P",))}, "display"),
+            *_each_path("facecolor", "C0"),
+            *_each_path("edgecolor", "C0"),
+            _each_path_rgba("facecolor"),
+            _each_path_rgba("edgecolor"),
+            *_each_path("linewidth", 1),
+            CoordinateEdge.from_coords("linestyle", {"linestyle": Desc(())}, "display"),
+            CoordinateEdge.from_coords("hatch", {"hatch": Desc(())}, "display"),
+            CoordinateEdge.from_coords("alpha", {"alpha": Desc(())}, "display"),
+            DefaultEdge.from_default_value(
+                "codes_def", "codes", Desc(("N",), "display"), None
+            ),
+            DefaultEdge.from_default_value("linestyle_def", "linestyle", scalar, "-"),
+            # (the alpha of the colors is kept unless one is given)
+            DefaultEdge.from_default_value("alpha_def", "alpha", scalar, None),
+            DefaultEdge.from_default_value("hatch_def", "hatch", scalar, None),
+        ]
+        self._graph = self._graph + Graph(def_edges)
+
+    def _prepare(self, graph: Graph, queried=None):
+        desc = Desc(("N",), "display")
+        per_path = Desc(("P",), "display")
+        scalar = Desc((), "display")
+
+        require = {
+            "x": desc,
+            "y": desc,
+            "codes": desc,
+            "lengths": per_path,
+            "facecolor": per_path,
+            "edgecolor": per_path,
+            "linewidth": per_path,
+            "linestyle": scalar,
+            "hatch": scalar,
+            "alpha": scalar,
+        }
+        return [
+            self._query_and_plan(
+                self._container, require, graph, cacheset="default", queried=queried
+            )
+        ]
+
+    def _emit(self, renderer, graph, evaluated):
+        (evald,) = evaluated
+
+        # Split the vertices (which were transformed together) into the paths
+        lengths = np.asarray(evald["lengths"], dtype=np.intp)
+        if not len(lengths):
+            return
+        bounds = np.cumsum(lengths)[:-1]
+        verts = np.split(np.column_stack([evald["x"], evald["y"]]), bounds)
+        codes = evald["codes"]
+        if codes is None:
+            paths = [mpath.Path(v) for v in verts]
+        else:
+            paths = [
+                mpath.Path._fast_from_codes_and_verts(verts=v, codes=c)
+                for v, c in zip(verts, np.split(np.asarray(codes), bounds))
+            ]
+
+        linewidths = np.asarray(evald["linewidth"], dtype=float)
+        dashes = mlines._get_dash_pattern(evald["linestyle"])
+
+        with _renderer_group(renderer, "patch_collection", None):
+            gc = renderer.new_gc()
+            gc.set_clip_rectangle(self._get_clip_bbox(graph))
+            gc.set_alpha(evald["alpha"])
+            if evald["hatch"] is not None:
+                gc.set_hatch(evald["hatch"])
+
+            renderer.draw_path_collection(
                 gc,
-                path,
                 mtransforms.IdentityTransform(),
-                mcolors.to_rgba(evald["facecolor"]),
+                paths,
+                np.empty((0, 3, 3)),
+                np.zeros((1, 2)),
+                mtransforms.IdentityTransform(),
+                # (the alpha of the context does not apply to collections)
+                mcolors.to_rgba_array(evald["facecolor"], evald["alpha"]),
+                mcolors.to_rgba_array(evald["edgecolor"], evald["alpha"]),
+                linewidths,
+                [mlines._scale_dashes(*dashes, lw) for lw in linewidths],
+                [True],
+                [None],
+                "screen",
             )
             gc.restore()
 
@@ -114,7 +287,71 @@ class Patch(Artist):
 class RectangleContainer(DataContainer): ...
 
 
+def _shape_params(keys: Sequence[str]) -> list[Edge]:
+    """Coordinate edges for shape parameters, given per shape or as scalars."""
+    edges = []
+    for k in keys:
+        edges.append(CoordinateEdge.from_coords(k, {k: Desc(())}, "data"))
+        edges.append(CoordinateEdge.from_coords(f"{k}_each", {k: Desc(("M",))}, "data"))
+    return edges
+
+
+def _shape_param_descs(
+    keys: Sequence[str], description: dict[str, Desc]
+) -> dict[str, Desc]:
+    """Require the parameters the container has as arrays per shape, others scalar."""
+    return {
+        k: Desc(("M",) if k in description and description[k].shape else (), "data")
+        for k in keys
+    }
+
+
+def _placed_path_edges(mats: np.ndarray) -> list[Edge]:
+    """Edges placing a copy of a unit path with each of the affine matrices *mats*.
+
+    The unit path is given by ``x``, ``y`` and ``codes`` in ``abstract_path``
+    coordinates, the vertices (and codes) of the copies are concatenated and
+    ``lengths`` is the number of vertices of each copy.
+    """
+    mats = mats.reshape(-1, 3, 3)
+
+    def place(x, y):
+        # (M, 2, 2) @ (2, V) + (M, 2, 1) -> (M, 2, V)
+        verts = mats[:, :2, :2] @ np.stack([x, y]) + mats[:, :2, 2:]
+        return verts[:, 0].ravel(), verts[:, 1].ravel()
+
+    descn: Desc = Desc(("N",), coordinates="data")
+    xy: dict[str, Desc] = {"x": descn, "y": descn}
+    return [
+        FuncEdge.from_func(
+            "place_paths", place, desc_like(xy, coordinates="abstract_path"), xy
+        ),
+        FuncEdge.from_func(
+            "tile_codes",
+            lambda codes: np.tile(codes, len(mats)),
+            {"codes": Desc(("N",), "abstract_path")},
+            {"codes": Desc(("N",), "display")},
+        ),
+        FuncEdge.from_func(
+            "copy_lengths",
+            lambda x: np.full(len(mats), len(x)),
+            {"x": Desc(("N",), "abstract_path")},
+            {"lengths": Desc(("P",), "display")},
+        ),
+    ]
+
+
 class Rectangle(Patch):
+    _params = (
+        "lower_left_x",
+        "lower_left_y",
+        "upper_right_x",
+        "upper_right_y",
+        "angle",
+        "rotation_point_x",
+        "rotation_point_y",
+    )
+
     def __init__(self, container, edges=None, **kwargs):
         super().__init__(container, edges, **kwargs)
 
@@ -122,24 +359,8 @@ class Rectangle(Patch):
 
         desc = Desc((4,), "abstract_path")
         scalar = Desc((), "data")
-        scalar_auto = Desc(())
         def_edges = [
-            CoordinateEdge.from_coords(
-                "llxycoords",
-                {"lower_left_x": scalar_auto, "lower_left_y": scalar_auto},
-                "data",
-            ),
-            CoordinateEdge.from_coords(
-                "urxycoords",
-                {"upper_right_x": scalar_auto, "upper_right_y": scalar_auto},
-                "data",
-            ),
-            CoordinateEdge.from_coords(
-                "rpxycoords",
-                {"rotation_point_x": scalar_auto, "rotation_point_y": scalar_auto},
-                "data",
-            ),
-            CoordinateEdge.from_coords("anglecoords", {"angle": scalar_auto}, "data"),
+            *_shape_params(self._params),
             DefaultEdge.from_default_value(
                 "x_def", "x", desc, rect.vertices.T[0], weight=0.1
             ),
@@ -147,11 +368,7 @@ class Rectangle(Patch):
                 "y_def", "y", desc, rect.vertices.T[1], weight=0.1
             ),
             DefaultEdge.from_default_value(
-                "codes_def",
-                "codes",
-                desc_like(desc, coordinates="display"),
-                rect.codes,
-                weight=0.1,
+                "codes_def", "codes", desc, rect.codes, weight=0.1
             ),
             DefaultEdge.from_default_value("angle_def", "angle", scalar, 0),
             DefaultEdge.from_default_value(
@@ -168,69 +385,51 @@ class Rectangle(Patch):
         if cacheset == "clip":
             return Graph([])
 
-        desc = Desc((), "data")
-
-        requires = {
-            "upper_right_x": desc,
-            "upper_right_y": desc,
-            "lower_left_x": desc,
-            "lower_left_y": desc,
-            "angle": desc,
-            "rotation_point_x": desc,
-            "rotation_point_y": desc,
-        }
+        requires = _shape_param_descs(self._params, description)
 
         g = graph + self._graph
 
         conv = g.evaluator(description, requires)
         evald = conv.evaluate(query)
 
-        bbox = mtransforms.Bbox.from_extents(
-            evald["lower_left_x"],
-            evald["lower_left_y"],
-            evald["upper_right_x"],
-            evald["upper_right_y"],
-        )
-        rotation_point = (evald["rotation_point_x"], evald["rotation_point_y"])
-
-        scale = mtransforms.BboxTransformTo(bbox)
-        rotate = (
-            mtransforms.Affine2D()
-            .translate(-rotation_point[0], -rotation_point[1])
-            .rotate_deg(evald["angle"])
-            .translate(*rotation_point)
+        llx, lly, urx, ury, angle, rpx, rpy = np.broadcast_arrays(
+            *(np.asarray(evald[k], dtype=float) for k in self._params)
         )
-
-        descn: Desc = Desc(("N",), coordinates="data")
-        xy: dict[str, Desc] = {"x": descn, "y": descn}
-        edges = [
-            TransformEdge(
-                "scale_and_rotate",
-                desc_like(xy, coordinates="abstract_path"),
-                xy,
-                transform=scale + rotate,
-            )
-        ]
-
-        return Graph(edges)
+        # Scale the unit square to the bounding box, then rotate about the
+        # rotation point
+        theta = np.deg2rad(angle)
+        cos, sin = np.cos(theta), np.sin(theta)
+        width, height = urx - llx, ury - lly
+        dx, dy = llx - rpx, lly - rpy
+        mats = np.zeros(llx.shape + (3, 3))
+        mats[..., 0, 0] = cos * width
+        mats[..., 0, 1] = -sin * height
+        mats[..., 0, 2] = cos * dx - sin * dy + rpx
+        mats[..., 1, 0] = sin * width
+        mats[..., 1, 1] = cos * height
+        mats[..., 1, 2] = sin * dx + cos * dy + rpy
+        mats[..., 2, 2] = 1
+
+        return Graph(_placed_path_edges(mats))
+
+
+@functools.lru_cache
+def _unit_regular_polygon(num_vertices: int):
+    """The vertices and codes of ``Path.unit_regular_polygon``."""
+    path = mpath.Path.unit_regular_polygon(num_vertices)
+    return path.vertices.T[0], path.vertices.T[1], path.codes
 
 
 class RegularPolygon(Patch):
+    _params = ("center_x", "center_y", "radius", "orientation")
+
     def __init__(self, container, edges=None, **kwargs):
         super().__init__(container, edges, **kwargs)
 
         scalar = Desc((), "data")
         scalar_auto = Desc(())
         def_edges = [
-            CoordinateEdge.from_coords(
-                "centercoords",
-                {"center_x": scalar_auto, "center_y": scalar_auto},
-                "data",
-            ),
-            CoordinateEdge.from_coords(
-                "orientationcoords", {"orientation": scalar_auto}, "data"
-            ),
-            CoordinateEdge.from_coords("radiuscoords", {"radius": scalar_auto}, "data"),
+            *_shape_params(self._params),
             CoordinateEdge.from_coords(
                 "num_vertices_coords", {"num_vertices": scalar_auto}, "data"
             ),
@@ -244,51 +443,39 @@ class RegularPolygon(Patch):
         if cacheset == "clip":
             return Graph([])
 
-        desc = Desc((), "data")
         desc_abs = Desc(("N",), "abstract_path")
 
-        requires = {
-            "center_x": desc,
-            "center_y": desc,
-            "radius": desc,
-            "orientation": desc,
-            "num_vertices": desc,
-        }
+        # The number of vertices is shared, the other parameters may be per polygon
+        requires = _shape_param_descs(self._params, description)
+        requires["num_vertices"] = Desc((), "data")
 
         g = graph + self._graph
 
         conv = g.evaluator(description, requires)
         evald = conv.evaluate(query)
 
-        circ = mpath.Path.unit_regular_polygon(evald["num_vertices"])
+        circ_x, circ_y, circ_codes = _unit_regular_polygon(int(evald["num_vertices"]))
 
-        scale = mtransforms.Affine2D().scale(evald["radius"])
-        rotate = mtransforms.Affine2D().rotate(evald["orientation"])
-        translate = mtransforms.Affine2D().translate(
-            evald["center_x"], evald["center_y"]
+        cx, cy, radius, orientation = np.broadcast_arrays(
+            *(np.asarray(evald[k], dtype=float) for k in self._params)
         )
+        # Scale, rotate, then translate to the center
+        cos, sin = np.cos(orientation), np.sin(orientation)
+        mats = np.zeros(cx.shape + (3, 3))
+        mats[..., 0, 0] = radius * cos
+        mats[..., 0, 1] = -radius * sin
+        mats[..., 0, 2] = cx
+        mats[..., 1, 0] = radius * sin
+        mats[..., 1, 1] = radius * cos
+        mats[..., 1, 2] = cy
+        mats[..., 2, 2] = 1
 
-        descn: Desc = Desc(("N",), coordinates="data")
-        xy: dict[str, Desc] = {"x": descn, "y": descn}
         edges = [
-            TransformEdge(
-                "scale_and_rotate",
-                desc_like(xy, coordinates="abstract_path"),
-                xy,
-                transform=scale + rotate + translate,
-            ),
-            DefaultEdge.from_default_value(
-                "x_def", "x", desc_abs, circ.vertices.T[0], weight=0.1
-            ),
-            DefaultEdge.from_default_value(
-                "y_def", "y", desc_abs, circ.vertices.T[1], weight=0.1
-            ),
+            *_placed_path_edges(mats),
+            DefaultEdge.from_default_value("x_def", "x", desc_abs, circ_x, weight=0.1),
+            DefaultEdge.from_default_value("y_def", "y", desc_abs, circ_y, weight=0.1),
             DefaultEdge.from_default_value(
-                "codes_def",
-                "codes",
-                desc_like(desc_abs, coordinates="display"),
-                circ.codes,
-                weight=0.1,
+                "codes_def", "codes", desc_abs, circ_codes, weight=0.1
             ),
         ]
 
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import io
+import os
+import pickle
+import tempfile
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from .artist import Artist, CompatibilityAxes
+from .containers import DataContainer
+
+# Arrays at least this large are passed to the workers through memory mapped
+# files rather than being pickled
+_MIN_SHARED_BYTES = 1 << 16
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    """How to build a figure with a single (compatibility) axes.
+
+    *build* is called with the *containers* as keyword arguments and returns the
+    artists to add, `.Artist` instances are added to the `.CompatibilityAxes` and
+    anything else (e.g. the `.wrappers`) to the Matplotlib axes.  To be rendered
+    by `render_many` both must be picklable, *build* usually being a module level
+    function (or a `functools.partial` of one) which creates the artists and their
+    edges.
+    """
+
+    build: Callable[..., Iterable[Any]]
+    containers: dict[str, DataContainer] = field(default_factory=dict)
+    xlim: tuple[float, float] | None = None
+    ylim: tuple[float, float] | None = None
+    figsize: tuple[float, float] = (6.4, 4.8)
+    dpi: float = 100
+    format: str = "png"
+
+
+def render_figure(spec: FigureSpec) -> bytes:
+    """Render *spec*, returning the encoded image."""
+    fig = Figure(figsize=spec.figsize, dpi=spec.dpi)
+    FigureCanvasAgg(fig)
+    nax = fig.subplots()
+    ax = CompatibilityAxes(nax)
+    nax.add_artist(ax)
+    if spec.xlim is not None:
+        ax.set_xlim(*spec.xlim)
+    if spec.ylim is not None:
+        ax.set_ylim(*spec.ylim)
+    for artist in spec.build(**spec.containers):
+        if isinstance(artist, Artist):
+            ax.add_artist(artist)
+        else:
+            nax.add_artist(artist)
+    buf = io.BytesIO()
+    fig.savefig(buf, format=spec.format)
+    return buf.getvalue()
+
+
+def render_many(
+    specs: Iterable[FigureSpec],
+    *,
+    max_workers: int | None = None,
+    mp_context=None,
+) -> list[bytes]:
+    """Render *specs* over a pool of processes, returning the encoded images in order.
+
+    Large arrays in the specs are written once to memory mapped files which the
+    workers share, rather than being pickled for every figure, so containers
+    shared between many specs cost little to send (`.SharedArrayContainer` are
+    always sent as a handle to their block).
+    """
+    with tempfile.TemporaryDirectory(prefix="mpl_data_containers-") as tmpdir:
+        shared = _SharedArrays(tmpdir)
+        payloads = [shared.dumps(spec) for spec in specs]
+        if not payloads:
+            return []
+        n_workers = max_workers or os.cpu_count() or 1
+        chunksize = max(1, len(payloads) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers, mp_context=mp_context) as pool:
+            return list(pool.map(_render_pickled, payloads, chunksize=chunksize))
+
+
+class _SharedArrays:
+    """Pickle objects with their large arrays written to *directory* (once each)."""
+
+    def __init__(self, directory: str):
+        self._directory = directory
+        # id -> (array, path), holding on to the arrays keeps the ids unique
+        self._written: dict[int, tuple[np.ndarray, str]] = {}
+
+    def dumps(self, obj) -> bytes:
+        buf = io.BytesIO()
+        _SharedArrayPickler(buf, self).dump(obj)
+        return buf.getvalue()
+
+    def path(self, arr: np.ndarray) -> str:
+        try:
+            _, path = self._written[id(arr)]
+        except KeyError:
+            path = os.path.join(self._directory, f"{len(self._written)}.npy")
+            np.save(path, arr)
+            self._written[id(arr)] = (arr, path)
+        return path
+
+
+class _SharedArrayPickler(pickle.Pickler):
+    def __init__(self, file, shared: _SharedArrays):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._shared = shared
+
+    def reducer_override(self, obj):
+        if (
+            type(obj) is not np.ndarray
+            or obj.dtype.hasobject
+            or obj.nbytes < _MIN_SHARED_BYTES
+        ):
+            return NotImplemented
+        return _load_shared, (self._shared.path(obj),)
+
+
+# The arrays mapped by this (worker) process, by path
+_loaded: dict[str, np.ndarray] = {}
+
+
+def _load_shared(path: str) -> np.ndarray:
+    try:
+        return _loaded[path]
+    except KeyError:
+        pass
+    arr = _loaded[path] = np.asarray(np.load(path, mmap_mode="r"))
+    return arr
+
+
+def _render_pickled(payload: bytes) -> bytes:
+    return render_figure(pickle.loads(payload))
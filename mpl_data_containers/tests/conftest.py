@@ -0,0 +1,18 @@
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import pytest
+
+from ..artist import CompatibilityAxes
+
+
+@pytest.fixture
+def axes():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    nax = fig.subplots()
+    ax = CompatibilityAxes(nax)
+    nax.add_artist(ax)
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    return ax
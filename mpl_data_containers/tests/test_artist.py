@@ -0,0 +1,310 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from unittest import mock
+
+import numpy as np
+
+from matplotlib.backend_bases import MouseEvent
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import pytest
+
+from ..artist import CompatibilityAxes
+from ..containers import ArrayContainer
+from ..line import Line
+from ..patches import Rectangle
+
+
+def test_dynamic_graph_cached(axes):
+    cont = ArrayContainer(
+        lower_left_x=np.array(1.0),
+        lower_left_y=np.array(1.0),
+        upper_right_x=np.array(3.0),
+        upper_right_y=np.array(4.0),
+    )
+    rect = Rectangle(cont)
+    axes.add_artist(rect)
+
+    with mock.patch.object(
+        Rectangle,
+        "_get_dynamic_graph",
+        autospec=True,
+        side_effect=Rectangle._get_dynamic_graph,
+    ) as dynamic:
+        axes.figure.canvas.draw()
+        n_built = dynamic.call_count
+        axes.figure.canvas.draw()
+        assert dynamic.call_count == n_built
+
+        cont.update(upper_right_x=np.array(5.0))
+        axes.figure.canvas.draw()
+        assert dynamic.call_count > n_built
+
+
+@pytest.mark.parametrize("linestyle, clipped", [("-", True), ("--", False)])
+def test_line_stroke_clipped(axes, linestyle, clipped):
+    x = np.linspace(0, 100, 10_000)
+    axes.add_artist(
+        Line(ArrayContainer(x=x, y=np.sin(x)), linestyle=linestyle, marker=".")
+    )
+    renderer = axes.figure.canvas.get_renderer()
+
+    with mock.patch.object(
+        renderer, "draw_path", wraps=renderer.draw_path
+    ) as draw_path, mock.patch.object(
+        renderer, "draw_markers", wraps=renderer.draw_markers
+    ) as draw_markers:
+        axes.figure.canvas.draw()
+
+    stroke = max((c.args[1] for c in draw_path.call_args_list), key=len)
+    if clipped:
+        # only a tenth of the line is within the axes
+        assert len(stroke) < len(x) / 10
+    else:
+        # dashes would be shifted by clipping
+        assert len(stroke) == len(x)
+    # the markers always get every point
+    assert len(draw_markers.call_args.args[3]) == len(x)
+
+
+def test_pick_skips_out_of_bounds(axes):
+    lines = [
+        Line(ArrayContainer(x=np.array([i, i + 0.5]), y=np.array([i, i + 0.5])))
+        for i in range(5)
+    ]
+    for ln in lines[1:]:
+        ln.set_picker(True)
+        axes.add_artist(ln)
+    # not pickable, but contains the event
+    axes.add_artist(lines[0])
+
+    picked = []
+    canvas = axes.figure.canvas
+    canvas.mpl_connect("pick_event", lambda event: picked.append(event.artist))
+    canvas.draw()
+    x, y = axes.axes.transData.transform([2.25, 2.25])
+
+    with mock.patch.object(
+        Line, "contains", autospec=True, side_effect=Line.contains
+    ) as contains:
+        axes.pick(MouseEvent("motion_notify_event", canvas, x, y))
+        assert [c.args[0] for c in contains.call_args_list] == [lines[2]]
+    assert picked == [lines[2]]
+
+
+def test_pick_extents_cached(axes):
+    cont = ArrayContainer(x=np.array([2.0, 2.5]), y=np.array([2.0, 2.5]))
+    lines = [
+        Line(ArrayContainer(x=np.array([i, i + 0.5]), y=np.array([i, i + 0.5])))
+        for i in range(2)
+    ] + [Line(cont)]
+    for ln in lines:
+        ln.set_picker(True)
+        axes.add_artist(ln)
+
+    picked = []
+    canvas = axes.figure.canvas
+    canvas.mpl_connect("pick_event", lambda event: picked.append(event.artist))
+    canvas.draw()
+
+    def pick_at(x, y):
+        picked.clear()
+        x, y = axes.axes.transData.transform([x, y])
+        axes.pick(MouseEvent("motion_notify_event", canvas, x, y))
+        return picked
+
+    with mock.patch.object(
+        Line, "_pick_bounds", autospec=True, side_effect=Line._pick_bounds
+    ) as bounds:
+        assert pick_at(2.25, 2.25) == [lines[2]]
+        assert bounds.call_count == 3
+        assert pick_at(0.25, 0.25) == [lines[0]]
+        assert bounds.call_count == 3
+
+        # the limits are changed without drawing
+        axes.set_xlim(1, 2)
+        axes.set_xlim(0, 3)
+        assert pick_at(1.25, 1.25) == [lines[1]]
+        assert bounds.call_count == 6
+
+        cont.update(x=np.array([5.0, 5.5]), y=np.array([5.0, 5.5]))
+        assert pick_at(2.25, 2.25) == []
+        assert bounds.call_count == 7
+        assert pick_at(5.25, 5.25) == [lines[2]]
+        assert bounds.call_count == 7
+
+
+def test_default_clip_bbox_shared(axes):
+    cont = ArrayContainer(x=np.array([1.0, 9.0]), y=np.array([1.0, 9.0]))
+    a, b = Line(cont), Line(cont)
+    graph = axes._graph
+
+    bbox = a._get_clip_bbox(graph)
+    assert b._get_clip_bbox(graph) is bbox
+    np.testing.assert_allclose(bbox.extents, axes.axes.bbox.extents)
+
+    axes.figure.set_size_inches(3, 3)
+    resized = b._get_clip_bbox(graph)
+    assert resized is not bbox
+    np.testing.assert_allclose(resized.extents, axes.axes.bbox.extents)
+
+    # each artist has a default of its own
+    assert a.get_clip_box(None) is not b.get_clip_box(None)
+    a.get_clip_box(None).update(x=np.array([0, 0.5]))
+    assert b._get_clip_bbox(graph) is resized
+    half = a._get_clip_bbox(graph)
+    np.testing.assert_allclose(
+        half.extents,
+        axes.axes.transAxes.transform([[0, 0], [0.5, 1]]).ravel(),
+    )
+
+    b.set_clip_box(
+        ArrayContainer(
+            {"x": "data", "y": "data"}, x=np.array([0, 5]), y=np.array([0, 5])
+        )
+    )
+    np.testing.assert_allclose(
+        b._get_clip_bbox(graph).extents,
+        axes.axes.transData.transform([[0, 0], [5, 5]]).ravel(),
+    )
+
+
+def test_blit_static_children(axes):
+    axes = CompatibilityAxes(axes.axes, blit=True)
+    axes.axes.add_artist(axes)
+    x = np.linspace(0, 10, 50)
+    static = Line(ArrayContainer(x=x, y=np.sin(x)))
+    animated = ArrayContainer(x=x, y=np.cos(x))
+    axes.add_artist(static)
+    axes.add_artist(Line(animated), zorder=2)
+    canvas = axes.figure.canvas
+    frames = iter(range(100))
+
+    def drawn(frame=None):
+        # a new frame of the animated line, which lines are rendered?
+        if frame is None:
+            frame = next(frames)
+        animated.update(y=np.cos(x + frame))
+        with mock.patch.object(
+            Line, "_emit", autospec=True, side_effect=Line._emit
+        ) as emit:
+            canvas.draw()
+        return [c.args[0] is static for c in emit.call_args_list]
+
+    assert drawn() == [True, False]
+    assert drawn() == [True, False]
+    # the static line is now restored from the saved canvas
+    assert drawn() == [False]
+    assert drawn() == [False]
+
+    # redrawn when changed, and saved again once unchanged for a frame
+    static.stale = True
+    assert drawn() == [True, False]
+    assert drawn() == [True, False]
+    assert drawn() == [False]
+
+    # as with changes of the transforms (several between frames), the canvas
+    # size and, once told, of what is drawn before the children
+    axes.set_ylim(-2, 2)
+    assert drawn() == [True, False]
+    assert drawn() == [False]
+    axes.set_xlim(0, 5)
+    axes.set_xlim(0, 8)
+    assert drawn() == [True, False]
+    assert drawn() == [False]
+    axes.figure.set_size_inches(5, 4)
+    assert drawn() == [True, False]
+    axes.axes.grid(True)
+    axes.stale = True
+    assert drawn() == [True, False]
+    assert drawn(frame=0.5) == [False]
+
+    blitted = np.asarray(canvas.buffer_rgba()).copy()
+    axes._blit = False
+    assert drawn(frame=0.5) == [True, False]
+    np.testing.assert_array_equal(np.asarray(canvas.buffer_rgba()), blitted)
+
+
+def _two_subplots(blit):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax1, ax2 = fig.subplots(1, 2)
+    axes = CompatibilityAxes(ax2, blit=blit)
+    ax2.add_artist(axes)
+    for ax in (ax1, ax2):
+        ax.set_xlim(0, 10)
+        ax.set_ylim(-1, 1)
+    return fig, ax1, axes
+
+
+def test_blit_other_axes():
+    x = np.linspace(0, 10, 50)
+    images = []
+    for blit in (True, False):
+        fig, ax1, axes = _two_subplots(blit)
+        (plain,) = ax1.plot(x, np.sin(x))
+        axes.add_artist(Line(ArrayContainer(x=x, y=np.cos(x))))
+        for frame in range(4):
+            plain.set_ydata(np.sin(x + frame))
+            fig.canvas.draw()
+        images.append(np.asarray(fig.canvas.buffer_rgba()).copy())
+    # the other subplot is drawn as it is now, not as when the area was saved
+    np.testing.assert_array_equal(*images)
+
+
+class _CountingContainer:
+    """An ArrayContainer counting its queries."""
+
+    def __init__(self, **data):
+        self._container = ArrayContainer(**data)
+        self.queries = 0
+
+    def describe(self):
+        return self._container.describe()
+
+    def query(self, graph, parent_coordinates="axes"):
+        self.queries += 1
+        return self._container.query(graph, parent_coordinates)
+
+
+@pytest.mark.parametrize("blit", [True, False])
+def test_blit_queries_once(blit):
+    x = np.linspace(0, 10, 50)
+    fig, _, axes = _two_subplots(blit)
+    static = _CountingContainer(x=x, y=np.sin(x))
+    animated = _CountingContainer(x=x, y=np.cos(x))
+    axes.add_artist(Line(static))
+    axes.add_artist(Line(animated), zorder=2)
+    for frame in range(3):
+        animated._container.update(y=np.cos(x + frame))
+        fig.canvas.draw()
+    assert static.queries == animated.queries == 3
+
+
+class _BarrierContainer:
+    """An ArrayContainer whose queries wait for those of the other containers."""
+
+    def __init__(self, barrier, **data):
+        self._barrier = barrier
+        self._container = ArrayContainer(**data)
+
+    def describe(self):
+        return self._container.describe()
+
+    def query(self, graph, parent_coordinates="axes"):
+        self._barrier.wait()
+        return self._container.query(graph, parent_coordinates)
+
+
+def test_prepare_concurrently(axes):
+    x = np.linspace(0, 10, 50)
+    barrier = threading.Barrier(3, timeout=10)
+    with ThreadPoolExecutor(3) as executor:
+        axes = CompatibilityAxes(axes.axes, executor=executor)
+        axes.axes.add_artist(axes)
+        for i in range(3):
+            axes.add_artist(Line(_BarrierContainer(barrier, x=x, y=np.sin(x + i))))
+        # would time out if the containers were queried one after the other
+        axes.figure.canvas.draw()
+    assert not barrier.broken
@@ -131,3 +131,31 @@ def test_missing_key():
     actual = {"a": Desc((3,), float)}
     with pytest.raises(KeyError):
         Desc.validate_shapes(spec, actual)
+
+
+def test_repeated_validation():
+    # results are memoized, make sure failures are still raised on a repeat
+    spec = {"a": ("N",), "b": ("N+1",)}
+    for _ in range(2):
+        Desc.validate_shapes(spec, {"a": (3,), "b": (4,)})
+        with pytest.raises(ValueError):
+            Desc.validate_shapes(spec, {"a": (3,), "b": (3,)})
+    Desc.validate_shapes({"a": ["N", "N+1"]}, {"a": [3, 4]})
+
+
+def test_desc_interned():
+    import pickle
+
+    a = Desc(("N",), "data")
+    assert Desc(["N"], coordinates="data") is a
+    assert pickle.loads(pickle.dumps(a)) is a
+    assert Desc(("N",)) != a
+
+
+def test_shape_checks_bounded():
+    from mpl_data_containers import description
+
+    # only two distinct shapes, but a check per key name
+    for i in range(description._MAX_SHAPE_CACHE + 10):
+        Desc.validate_shapes({f"a{i}": ("N",)}, {f"a{i}": (3,)})
+        assert len(description._shape_checks) <= description._MAX_SHAPE_CACHE
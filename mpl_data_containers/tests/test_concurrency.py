@@ -0,0 +1,119 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..artist import CompatibilityAxes
+from ..containers import ArrayContainer, HistContainer
+from ..conversion_edge import _MAX_EVALUATORS, CoordinateEdge, DefaultEdge, Graph
+from ..description import Desc
+from ..line import Line
+from ..wrappers import StepWrapper
+
+N_THREADS = 4
+
+
+def _make_axes():
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    nax = fig.subplots()
+    ax = CompatibilityAxes(nax)
+    nax.add_artist(ax)
+    ax.set_xlim(0, 10)
+    ax.set_ylim(0, 10)
+    return nax, ax
+
+
+def _updating(update, n=200):
+    stop = threading.Event()
+
+    def run():
+        for i in range(n):
+            if stop.is_set():
+                break
+            update(i)
+
+    return stop, threading.Thread(target=run)
+
+
+def test_array_container_snapshot():
+    cont = ArrayContainer(a=np.zeros(100), b=np.zeros(100))
+    stop, updater = _updating(
+        lambda i: cont.update(a=np.full(100, i), b=np.full(100, i)), n=10_000
+    )
+
+    def check(_):
+        for _ in range(1_000):
+            data, _ = cont.query(None)
+            np.testing.assert_array_equal(data["a"], data["b"])
+
+    updater.start()
+    try:
+        with ThreadPoolExecutor(N_THREADS) as pool:
+            list(pool.map(check, range(N_THREADS)))
+    finally:
+        stop.set()
+        updater.join()
+
+
+def test_shared_graph():
+    graph = Graph(
+        [CoordinateEdge.from_coords("xy", {"x": "auto", "y": "auto"}, "data")]
+    )
+    defaults = Graph(
+        [DefaultEdge.from_default_value("c_def", "c", Desc((), "display"), "C0")]
+    )
+    output = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+
+    def plan(i):
+        # more shapes than plans kept, so they are evicted while being read
+        results = []
+        for n in range(i, i + 2 * _MAX_EVALUATORS):
+            conv = graph.evaluator({"x": Desc((n,)), "y": Desc((n,))}, output)
+            results.append((conv.evaluate({"x": n, "y": -n}), graph + defaults))
+        return results
+
+    with ThreadPoolExecutor(N_THREADS) as pool:
+        all_results = list(pool.map(plan, range(N_THREADS)))
+    for i, results in enumerate(all_results):
+        for n, (res, total) in enumerate(results, start=i):
+            assert res == {"x": n, "y": -n}
+            # every thread gets the same sum
+            assert total is all_results[0][0][1]
+
+
+def test_render_shared_containers():
+    x = np.linspace(0, 10, 1_000)
+    line_data = ArrayContainer(x=x, y=np.full_like(x, 5))
+    hist_data = HistContainer(np.random.default_rng(0).normal(5, 2, 10_000), 50)
+
+    all_axes = []
+    for _ in range(N_THREADS):
+        nax, ax = _make_axes()
+        ax.add_artist(Line(line_data))
+        nax.add_artist(StepWrapper(hist_data))
+        all_axes.append(ax)
+
+    stop, updater = _updating(lambda i: line_data.update(y=np.full_like(x, i % 10)))
+
+    def render(ax):
+        for _ in range(5):
+            ax.figure.canvas.draw()
+
+    updater.start()
+    try:
+        with ThreadPoolExecutor(N_THREADS) as pool:
+            list(pool.map(render, all_axes))
+    finally:
+        stop.set()
+        updater.join()
+
+    # once the data settles every figure renders the same
+    with ThreadPoolExecutor(N_THREADS) as pool:
+        list(pool.map(lambda ax: ax.figure.canvas.draw(), all_axes))
+    images = [np.asarray(ax.figure.canvas.buffer_rgba()) for ax in all_axes]
+    for image in images[1:]:
+        np.testing.assert_array_equal(image, images[0])
@@ -1,3 +1,8 @@
+from concurrent.futures import ProcessPoolExecutor
+import pickle
+import subprocess
+import sys
+
 import numpy as np
 
 from matplotlib.transforms import IdentityTransform
@@ -61,6 +66,85 @@ def test_array_no_new_keys(ac):
         ac.update(d=[1, 2])
 
 
+@pytest.fixture
+def sac():
+    return containers.SharedArrayContainer(
+        a=np.arange(5), b=np.arange(42, dtype=float).reshape(6, 7)
+    )
+
+
+def test_shared_describe(sac):
+    _verify_describe(sac)
+
+
+def test_shared_pickle(sac):
+    payload = pickle.dumps(sac)
+    assert len(payload) < sac.describe()["b"].shape[0] * 7 * 8
+    copy = pickle.loads(payload)
+    assert copy.describe() == sac.describe()
+
+    sac.update(a=np.arange(5) * 2)
+    data, cache_key = sac.query(IdentityTransform(), [100, 100])
+    data2, cache_key_2 = copy.query(IdentityTransform(), [100, 100])
+    assert cache_key == cache_key_2
+    for k in set(data) | set(data2):
+        assert np.all(data[k] == data2[k])
+
+
+def _update_shared(cont):
+    cont.update(b=-cont.query(None)[0]["b"])
+    return cont.query(None)[1]
+
+
+def test_shared_update_other_process(sac):
+    _, cache_key = sac.query(IdentityTransform(), [100, 100])
+    with ProcessPoolExecutor(1) as pool:
+        other_key = pool.submit(_update_shared, sac).result()
+    data, cache_key_2 = sac.query(IdentityTransform(), [100, 100])
+
+    assert cache_key != cache_key_2 == other_key
+    assert np.all(data["b"] == -np.arange(42).reshape(6, 7))
+
+
+_ATTACH_SCRIPT = """
+import pickle, sys
+from multiprocessing import resource_tracker
+
+cont = pickle.load(sys.stdin.buffer)
+print(cont.query(None)[0]["a"].tolist())
+tracker = resource_tracker._resource_tracker
+if hasattr(tracker, "_stop"):
+    # the tracker frees what is registered with it once stopped
+    tracker._stop()
+"""
+
+
+def test_shared_attach_other_process(sac):
+    # not started by multiprocessing, so with a resource tracker of its own
+    proc = subprocess.run(
+        [sys.executable, "-c", _ATTACH_SCRIPT],
+        input=pickle.dumps(sac),
+        capture_output=True,
+        check=True,
+    )
+    assert proc.stdout.decode().strip() == str(list(range(5)))
+    assert b"leaked" not in proc.stderr
+
+    # the block is still there
+    copy = pickle.loads(pickle.dumps(sac))
+    np.testing.assert_array_equal(copy.query(None)[0]["a"], np.arange(5))
+
+
+def test_shared_update_errors(sac):
+    with pytest.raises(containers.NoNewKeys):
+        sac.update(d=[1, 2])
+    with pytest.raises(ValueError):
+        sac.update(a=np.arange(6))
+    data, _ = sac.query(IdentityTransform(), [100, 100])
+    with pytest.raises(ValueError):
+        data["a"][0] = 1
+
+
 @pytest.fixture
 def rc():
     return containers.RandomContainer(a=(5,), b=(6, 7))
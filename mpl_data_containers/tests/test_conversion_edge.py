@@ -0,0 +1,353 @@
+import pickle
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from matplotlib.figure import Figure
+from matplotlib.transforms import Affine2D, Transform
+
+from mpl_data_containers.conversion_edge import (
+    _MAX_BATCHED,
+    _MAX_EVALUATORS,
+    _MAX_ROUTES,
+    CoordinateEdge,
+    DefaultEdge,
+    Graph,
+    NoPathFound,
+    SequenceEdge,
+    TransformEdge,
+    evaluate_many,
+    transform_key,
+)
+from mpl_data_containers.description import Desc, desc_like
+
+
+@pytest.fixture
+def style_graph():
+    scalar = Desc((), "display")
+    keys = [f"style{i}" for i in range(4)]
+    edges = [
+        *(CoordinateEdge.from_coords(k, {k: Desc(())}, "display") for k in keys),
+        *(
+            DefaultEdge.from_default_value(f"{k}_def", k, scalar, i)
+            for i, k in enumerate(keys)
+        ),
+        # couple all of the keys into a single subgraph
+        CoordinateEdge.from_coords("all", {k: scalar for k in keys}, "combined"),
+    ]
+    return Graph(edges), keys
+
+
+@pytest.mark.parametrize("heuristic", [True, False])
+def test_search_finds_cheapest(style_graph, heuristic):
+    graph, keys = style_graph
+    input = {k: Desc(()) for k in keys[:2]}
+    output = {k: Desc((), "display") for k in keys}
+    node, _ = graph._search(input, output, 0, heuristic=heuristic)
+    assert node.weight == 2 + 2e6
+    assert {e.name for e in node.edges if e is not None} == {
+        "style0",
+        "style1",
+        "style2_def",
+        "style3_def",
+    }
+
+
+def test_pruned_search_same_path():
+    scalar = Desc(())
+
+    def coord(name, key, src, dst, weight):
+        return CoordinateEdge.from_coords(name, {key: Desc((), src)}, dst, weight)
+
+    edges = [
+        coord("a_mid", "a", "auto", "mid", 1),
+        coord("a_display", "a", "mid", "display", 1.5),
+        coord("a_direct", "a", "auto", "display", 3),
+        coord("a_back", "a", "display", "mid", 0.2),
+        coord("b_display", "b", "auto", "display", 1.25),
+        DefaultEdge.from_default_value("b_def", "b", Desc((), "display"), 0, weight=2),
+        CoordinateEdge.from_coords(
+            "ab", {"a": Desc((), "display"), "b": Desc((), "display")}, "combined", 4
+        ),
+        # dead ends, cheap but never leading to any output
+        coord("a_dead", "a", "auto", "nowhere", 0.1),
+        coord("a_deader", "a", "nowhere", "void", 0.1),
+        CoordinateEdge.from_coords(
+            "c_dead", {"a": Desc((), "mid"), "c": scalar}, "void", 0.1
+        ),
+    ]
+    graph = Graph(edges)
+    (n_sub,) = range(len(graph._subgraphs))
+    for input, coords in [
+        ({"a": scalar, "b": scalar}, "display"),
+        ({"a": scalar}, "display"),
+        ({"a": scalar, "b": scalar}, "combined"),
+        ({"a": Desc((), "mid"), "b": Desc((), "display")}, "combined"),
+    ]:
+        output = {"a": Desc((), coords), "b": Desc((), coords)}
+        pruned, n_pruned = graph._search(input, output, n_sub)
+        full, n_full = graph._search(input, output, n_sub, heuristic=False, prune=False)
+        assert pruned.weight == full.weight
+        # (independent edges may be taken in any order)
+        assert sorted(e.name for e in pruned.edges[1:]) == sorted(
+            e.name for e in full.edges[1:]
+        )
+        assert n_pruned < n_full
+
+
+def test_evaluator():
+    graph = Graph(
+        [
+            CoordinateEdge.from_coords("xy", {"x": "auto", "y": "auto"}, "data"),
+            DefaultEdge.from_default_value(
+                "color_def", "color", Desc((), "display"), "C0"
+            ),
+        ]
+    )
+    conv = graph.evaluator(
+        {"x": Desc(("N",)), "y": Desc(("N",))},
+        {
+            "x": Desc(("N",), "data"),
+            "y": Desc(("N",), "data"),
+            "color": Desc((), "display"),
+        },
+    )
+    assert conv.evaluate({"x": 1, "y": 2}) == {"x": 1, "y": 2, "color": "C0"}
+    # plans are memoized
+    assert conv is graph.evaluator(
+        {"x": Desc(("N",)), "y": Desc(("N",))},
+        {
+            "x": Desc(("N",), "data"),
+            "y": Desc(("N",), "data"),
+            "color": Desc((), "display"),
+        },
+    )
+
+
+def test_route_single_key():
+    scalar = Desc((), "display")
+    graph = Graph(
+        [
+            CoordinateEdge.from_coords("c_data", {"c": Desc(())}, "data"),
+            CoordinateEdge.from_coords("c_display", {"c": Desc((), "data")}, "display"),
+            DefaultEdge.from_default_value("c_def", "c", scalar, 0),
+        ]
+    )
+    (n_sub,) = range(len(graph._subgraphs))
+    assert [e.name for e in graph._route(n_sub, Desc(()), scalar)] == [
+        "c_data",
+        "c_display",
+    ]
+    assert [e.name for e in graph._route(n_sub, None, scalar)] == ["c_def"]
+    assert graph._route(n_sub, None, Desc((), "data")) is None
+
+    conv = graph.evaluator({}, {"c": scalar})
+    assert conv.evaluate({}) == {"c": 0}
+
+
+def test_routes_bounded():
+    graph = Graph([CoordinateEdge.from_coords("c_data", {"c": Desc(("N",))}, "data")])
+    (n_sub,) = range(len(graph._subgraphs))
+    for n in range(_MAX_ROUTES + 10):
+        route = graph._route(n_sub, Desc((n,)), Desc(("N",), "data"))
+        assert [e.name for e in route] == ["c_data"]
+    index = graph._edge_index(n_sub)
+    assert len(index.routes) == len(index.routes_from) == _MAX_ROUTES
+
+
+def test_add(style_graph):
+    graph, keys = style_graph
+    xy = Graph(
+        [
+            CoordinateEdge.from_coords(
+                "xy", {"x": Desc(("N",), "auto"), "y": Desc(("N",), "auto")}, "data"
+            )
+        ],
+        aliases=(("parent", "axes"),),
+    )
+    extra = Graph(
+        [
+            CoordinateEdge.from_coords(
+                "x_style0", {"x": "data", "style0": "data"}, "axes"
+            ),
+            DefaultEdge.from_default_value("c_def", "c", Desc((), "display"), 0),
+        ]
+    )
+    empty = Graph([])
+
+    assert empty + xy is xy
+    assert xy + empty is xy
+    assert xy + extra is xy + extra
+
+    composed = xy + extra + graph
+    flat = Graph(xy._edges + extra._edges + graph._edges, xy._aliases)
+    assert composed._aliases == flat._aliases
+    assert sorted(sorted(k) for k, _ in composed._subgraphs) == sorted(
+        sorted(k) for k, _ in flat._subgraphs
+    )
+    # the subgraph of "c" is shared as is
+    assert extra._subgraphs[1] in composed._subgraphs
+
+    restored = pickle.loads(pickle.dumps(composed))
+    assert restored._edges == composed._edges
+    assert restored._aliases == composed._aliases
+
+
+def test_partition():
+    graph = Graph(
+        [
+            CoordinateEdge.from_coords("ab", {"a": "auto", "b": "auto"}, "data"),
+            CoordinateEdge.from_coords("cd", {"c": "auto", "d": "auto"}, "data"),
+            CoordinateEdge.from_coords("e", {"e": "auto"}, "data"),
+            # joins the first two subgraphs
+            CoordinateEdge.from_coords("bc", {"b": "data", "c": "data"}, "axes"),
+        ]
+    )
+    assert [
+        (set(keys), [e.name for e in edges]) for keys, edges in graph._subgraphs
+    ] == [
+        ({"a", "b", "c", "d"}, ["ab", "cd", "bc"]),
+        ({"e"}, ["e"]),
+    ]
+    assert graph._key_subgraph == {"a": 0, "b": 0, "c": 0, "d": 0, "e": 1}
+
+
+def test_no_path():
+    graph = Graph(
+        [
+            CoordinateEdge.from_coords("xy", {"x": "auto", "y": "auto"}, "data"),
+            CoordinateEdge.from_coords("x", {"x": "data"}, "display"),
+        ]
+    )
+    input = {"x": Desc(("N",)), "y": Desc(("N",))}
+    output = {"x": Desc(("N",), "display"), "y": Desc(("N",), "display")}
+    with pytest.raises(NoPathFound, match="resolve all outputs") as excinfo:
+        graph.evaluator(input, output)
+    exc = excinfo.value
+    assert isinstance(exc, NotImplementedError)
+    assert exc.unmet == {"y"}
+    assert exc.partial[0] == ["xy", "x"]
+    assert input in exc.frontier
+
+    restored = pickle.loads(pickle.dumps(exc))
+    assert restored.graph is None
+    assert restored.unmet == exc.unmet
+    assert restored.partial == exc.partial
+
+    with pytest.raises(NoPathFound) as excinfo:
+        graph.evaluator(input, {"color": Desc((), "display")})
+    assert excinfo.value.unmet == {"color"}
+
+
+def test_evaluate_many():
+    xy = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+    trf = Affine2D().scale(2).translate(1, 0)
+    to_display = TransformEdge(
+        "display", xy, desc_like(xy, coordinates="display"), transform=trf
+    )
+    seq = SequenceEdge.from_edges(
+        "seq",
+        [
+            CoordinateEdge.from_coords("xy", {"x": "auto", "y": "auto"}, "data"),
+            to_display,
+        ],
+        desc_like(xy, coordinates="display"),
+    )
+    plans = [
+        (to_display, {"x": np.arange(3.0), "y": np.arange(3.0)}),
+        (seq, {"x": np.ones(2), "y": np.zeros(2)}),
+        (to_display, {"x": 1.0, "y": 2.0}),
+    ]
+    expected = [edge.evaluate(dict(input)) for edge, input in plans]
+
+    with mock.patch.object(trf, "transform", wraps=trf.transform) as transform:
+        results = evaluate_many(plans)
+    assert transform.call_count == 1
+
+    for res, exp in zip(results, expected):
+        assert res.keys() == exp.keys()
+        for k in exp:
+            np.testing.assert_array_equal(res[k], exp[k])
+            assert np.shape(res[k]) == np.shape(exp[k])
+
+
+class _Doubling(Transform):
+    """Doubles any array of points (also of more than one dimension)."""
+
+    input_dims = output_dims = 2
+
+    def transform(self, values):
+        return 2 * np.asarray(values)
+
+
+@pytest.mark.parametrize("plain", [True, False])
+def test_evaluate_many_large(plain):
+    xy = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+    trf = _Doubling()
+    to_display = TransformEdge(
+        "display", xy, desc_like(xy, coordinates="display"), transform=trf
+    )
+    large = np.arange(_MAX_BATCHED + 1.0)
+    plans = [
+        (to_display, {"x": large, "y": large}),
+        (to_display, {"x": np.arange(3.0), "y": np.arange(3.0)}),
+        (to_display, {"x": large, "y": large}),
+        (to_display, {"x": 1.0, "y": 2.0}),
+    ]
+    if not plain:
+        # which is not batched at all
+        plans.append((to_display, {"x": np.ones((2, 2)), "y": np.ones((2, 2))}))
+    expected = [edge.evaluate(dict(input)) for edge, input in plans]
+
+    with mock.patch.object(trf, "transform", wraps=trf.transform) as transform:
+        results = evaluate_many(plans)
+    # each large input transformed once, on its own
+    sizes = sorted(len(c.args[0]) for c in transform.call_args_list)
+    if plain:
+        assert sizes == [4, _MAX_BATCHED + 1, _MAX_BATCHED + 1]
+    else:
+        # every input on its own, the scalars as a single point
+        assert sizes == [2, 2, 3, _MAX_BATCHED + 1, _MAX_BATCHED + 1]
+
+    for res, exp in zip(results, expected):
+        for k in exp:
+            np.testing.assert_array_equal(res[k], exp[k])
+
+
+def test_evaluators_bounded():
+    graph = Graph(
+        [
+            CoordinateEdge.from_coords("xy", {"x": "auto", "y": "auto"}, "data"),
+        ]
+    )
+    output = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+    # one plan per concrete input shape
+    for n in range(_MAX_EVALUATORS + 10):
+        graph.evaluator({"x": Desc((n,)), "y": Desc((n,))}, output)
+    assert len(graph._evaluators) == _MAX_EVALUATORS
+
+
+def test_transform_key_without_evaluating():
+    fig = Figure()
+    ax = fig.subplots()
+    xy = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+    edge = TransformEdge(
+        "data", xy, desc_like(xy, coordinates="display"), transform=ax.transData
+    )
+    keys = [transform_key(edge)]
+
+    # nothing evaluates the transform in between
+    changes = [
+        lambda: ax.set_xlim(0, 2),
+        lambda: ax.set_xlim(0, 3),
+        lambda: ax.set_xlim(0, 4),
+        lambda: fig.set_size_inches(3, 2),
+        lambda: fig.set_dpi(50),
+        lambda: ax.set_xscale("log"),
+    ]
+    for change in changes:
+        change()
+        keys.append(transform_key(edge))
+    assert len(set(keys)) == len(keys)
+    assert transform_key(edge) == keys[-1]
@@ -0,0 +1,93 @@
+import numpy as np
+
+import pytest
+
+from ..conversion_node import (
+    DelayedConversionNode,
+    FunctionConversionNode,
+    LimitKeysConversionNode,
+    RenameConversionNode,
+    UnionConversionNode,
+    compile_pipeline,
+    evaluate_pipeline,
+)
+
+
+def _pipeline():
+    return [
+        DelayedConversionNode.from_keys(("x",), converter_key="xunits"),
+        lambda x: np.ravel(x),
+        lambda s: s if s is not None else [20],
+        FunctionConversionNode.from_funcs({"area": lambda s: np.pi * np.square(s)}),
+        RenameConversionNode.from_mapping({"s": "sizes"}),
+        UnionConversionNode.from_nodes(
+            FunctionConversionNode.from_funcs({"n": lambda x: len(x)}),
+            RenameConversionNode.from_mapping({"y": "ydata"}),
+        ),
+        LimitKeysConversionNode.from_keys(["x", "ydata", "sizes", "area", "n"]),
+    ]
+
+
+@pytest.mark.parametrize("s", [None, np.array([1.0, 2.0])])
+def test_compiled_matches(s):
+    input = {"x": [[0, 1], [2, 3]], "y": np.arange(4), "s": s, "c": "C0"}
+    converters = {"xunits": lambda x: np.asarray(x) * 2}
+    expected = evaluate_pipeline(_pipeline(), dict(input), converters)
+    compiled = compile_pipeline(_pipeline(), input)
+    result = compiled.evaluate(dict(input), converters)
+
+    assert list(result) == list(expected)
+    for k, v in expected.items():
+        np.testing.assert_array_equal(result[k], v)
+
+
+def test_compiled_skips_dead_keys():
+    calls = []
+
+    def expensive(x):
+        calls.append(x)
+        return x
+
+    pipeline = [
+        FunctionConversionNode.from_funcs({"dead": expensive, "y": lambda x: x + 1}),
+        LimitKeysConversionNode.from_keys(["y"]),
+    ]
+    compiled = compile_pipeline(pipeline, ["x"])
+    assert compiled.evaluate({"x": 1}) == {"y": 2}
+    assert calls == []
+
+
+def test_compiled_missing_keys():
+    with pytest.raises(ValueError, match="Missing keys"):
+        compile_pipeline([lambda y: y], ["x"])
+
+
+def test_compiled_memoized():
+    calls = []
+
+    def count(name, func):
+        def counted(x):
+            calls.append(name)
+            return func(x)
+
+        return counted
+
+    pipeline = [
+        FunctionConversionNode.from_funcs({"x": count("x", lambda x: x + 1)}),
+        FunctionConversionNode.from_funcs({"y": count("y", lambda x: 2 * x)}),
+    ]
+    compiled = compile_pipeline(pipeline, ["x"])
+    x = np.arange(3)
+    compiled.evaluate({"x": x}, versions={"x": 1})
+    assert calls == ["x", "y"]
+    # the output of the first node is reused, so the second one is skipped too
+    compiled.evaluate({"x": x}, versions={"x": 1})
+    assert calls == ["x", "y"]
+    # the same object, modified in place
+    x += 1
+    result = compiled.evaluate({"x": x}, versions={"x": 2})
+    assert calls == ["x", "y"] * 2
+    np.testing.assert_array_equal(result["y"], 2 * (x + 1))
+    # without versions nothing is reused
+    compiled.evaluate({"x": x})
+    assert calls == ["x", "y"] * 3
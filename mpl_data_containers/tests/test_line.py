@@ -0,0 +1,123 @@
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+
+from matplotlib.lines import segment_hits
+
+import pytest
+
+from .. import line
+from ..containers import ArrayContainer
+from ..line import Line, _HitIndex
+
+
+@pytest.mark.parametrize("segments", [True, False])
+def test_hit_index(segments):
+    rng = np.random.default_rng(0)
+    x = np.cumsum(rng.normal(0, 5, 500))
+    y = np.cumsum(rng.normal(0, 5, 500))
+    x[[10, 20, 21]] = np.nan
+    y[30] = np.inf
+    x[40] = 1e300
+
+    index = _HitIndex(x, y, 5, segments)
+    for cx, cy in zip(rng.choice(x[:100], 200) + rng.normal(0, 5, 200), y[:200]):
+        with np.errstate(all="ignore"):
+            if segments:
+                expected = segment_hits(cx, cy, x, y, 5)
+            else:
+                (expected,) = np.nonzero((x - cx) ** 2 + (y - cy) ** 2 <= 25)
+        np.testing.assert_array_equal(index.hits(cx, cy), expected)
+
+
+def test_contains_cached(axes):
+    cont = ArrayContainer(x=np.array([1.0, 9.0]), y=np.array([1.0, 9.0]))
+    ln = Line(cont)
+    axes.add_artist(ln)
+    graph = axes._graph
+    x, y = axes.axes.transData.transform([5, 5])
+
+    with mock.patch.object(line, "_HitIndex", wraps=_HitIndex) as index:
+        assert ln.contains(SimpleNamespace(x=x, y=y), graph)[0]
+        assert not ln.contains(SimpleNamespace(x=x + 20, y=y), graph)[0]
+        assert index.call_count == 1
+
+        # the display space points depend on the limits
+        axes.set_xlim(0, 20)
+        assert not ln.contains(SimpleNamespace(x=x, y=y), graph)[0]
+        assert index.call_count == 2
+
+        # now passing through (10, 5), where the (5, 5) of before is
+        cont.update(x=np.array([0.0, 20.0]), y=np.array([0.0, 10.0]))
+        assert ln.contains(SimpleNamespace(x=x, y=y), graph)[0]
+        assert index.call_count == 3
+
+
+@pytest.mark.parametrize("linestyle", ["-", "--", ":", (2, (3, 1, 1, 1))])
+def test_dash_pattern(linestyle):
+    import matplotlib.lines as mlines
+
+    expected = mlines._scale_dashes(*mlines._get_dash_pattern(linestyle), 2.0)
+    offset, dashes = line._cached(line._dash_pattern, linestyle, np.array(2.0))
+    assert offset == expected[0]
+    if expected[1] is None:
+        assert dashes is None
+    else:
+        # shared between callers, so immutable
+        assert dashes == tuple(expected[1])
+    assert line._cached(line._dash_pattern, linestyle, 2.0)[1] is dashes
+
+
+def test_marker_stamp():
+    from matplotlib.markers import MarkerStyle
+    from matplotlib.path import Path
+
+    marker = MarkerStyle("o")
+    path, trans = line._cached(line._marker_stamp, "o", np.array(12.0))
+    assert path is marker.get_path()
+    np.testing.assert_allclose(
+        trans.get_matrix(), marker.get_transform().scale(12.0).get_matrix()
+    )
+    assert line._cached(line._marker_stamp, "o", 12.0)[1] is trans
+
+    # markers given as paths are not cached, but give the same stamp
+    square = Path([(0, 0), (0, 1), (1, 1), (1, 0), (0, 0)], closed=True)
+    path, trans = line._cached(line._marker_stamp, square, 12.0)
+    marker = MarkerStyle(square)
+    np.testing.assert_allclose(path.vertices, marker.get_path().vertices)
+    np.testing.assert_allclose(
+        trans.get_matrix(), marker.get_transform().scale(12.0).get_matrix()
+    )
+
+
+def test_markers_solid(axes):
+    x = np.linspace(0, 10, 20)
+    axes.add_artist(
+        Line(
+            ArrayContainer(x=x, y=x),
+            linestyle="--",
+            linewidth=3,
+            marker="o",
+            markeredgewidth=0.5,
+        )
+    )
+    renderer = axes.figure.canvas.get_renderer()
+
+    with mock.patch.object(
+        renderer, "draw_path", wraps=renderer.draw_path
+    ) as draw_path, mock.patch.object(
+        renderer, "draw_markers", wraps=renderer.draw_markers
+    ) as draw_markers:
+        axes.figure.canvas.draw()
+
+    (line_gc,) = {
+        c.args[0] for c in draw_path.call_args_list if c.args[0].get_dashes()[1]
+    }
+    marker_gc = draw_markers.call_args.args[0]
+    assert marker_gc is not line_gc
+    assert marker_gc.get_dashes() == (0, None)
+    assert marker_gc.get_linewidth() == 0.5
+    np.testing.assert_allclose(
+        marker_gc.get_clip_rectangle().bounds, line_gc.get_clip_rectangle().bounds
+    )
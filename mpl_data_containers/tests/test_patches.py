@@ -0,0 +1,222 @@
+from unittest import mock
+
+import numpy as np
+
+import matplotlib.colors as mcolors
+from matplotlib.path import Path
+
+import pytest
+
+from ..containers import ArrayContainer
+from ..patches import PatchCollection, Rectangle, RegularPolygon
+
+
+def _draw_collection(axes, **kwargs):
+    """Draw a `.PatchCollection` of *kwargs*, returning the collection drawn."""
+    axes.add_artist(PatchCollection(ArrayContainer(**kwargs)))
+    renderer = axes.figure.canvas.get_renderer()
+    with mock.patch.object(
+        renderer, "draw_path_collection", wraps=renderer.draw_path_collection
+    ) as draw:
+        axes.figure.canvas.draw()
+    return draw
+
+
+# a triangle and a square
+_X = np.array([1.0, 2, 1, 4, 5, 5, 4])
+_Y = np.array([1.0, 1, 2, 4, 4, 5, 5])
+
+
+@pytest.mark.parametrize("dtype", [int, float])
+def test_paths_split(axes, dtype):
+    draw = _draw_collection(axes, x=_X, y=_Y, lengths=np.array([3, 4], dtype=dtype))
+    (call,) = draw.call_args_list
+    paths = call.args[2]
+    assert [len(p.vertices) for p in paths] == [3, 4]
+    trans = axes.axes.transData
+    np.testing.assert_allclose(paths[1].vertices, trans.transform([*zip(_X, _Y)][3:]))
+
+
+def test_per_path_styles(axes):
+    draw = _draw_collection(
+        axes,
+        x=_X,
+        y=_Y,
+        lengths=np.array([3, 4]),
+        facecolor=np.array(["r", "b"]),
+        edgecolor=np.array(["k", "g"]),
+        linewidth=np.array([1.0, 3.0]),
+    )
+    args = draw.call_args.args
+    np.testing.assert_array_equal(args[6], mcolors.to_rgba_array(["r", "b"]))
+    np.testing.assert_array_equal(args[7], mcolors.to_rgba_array(["k", "g"]))
+    np.testing.assert_array_equal(args[8], [1.0, 3.0])
+    # solid strokes of either width
+    assert [d[1] for d in args[9]] == [None, None]
+
+
+def test_per_path_rgba(axes):
+    rgba = np.array([[1.0, 0, 0, 1], [0, 0, 1, 0.5]])
+    draw = _draw_collection(
+        axes, x=_X, y=_Y, lengths=np.array([3, 4]), facecolor=rgba, edgecolor=rgba
+    )
+    args = draw.call_args.args
+    np.testing.assert_array_equal(args[6], rgba)
+    np.testing.assert_array_equal(args[7], rgba)
+
+
+def test_alpha(axes):
+    draw = _draw_collection(
+        axes,
+        x=_X,
+        y=_Y,
+        lengths=np.array([3, 4]),
+        facecolor=np.array(["r", "b"]),
+        edgecolor="k",
+        alpha=0.3,
+    )
+    args = draw.call_args.args
+    np.testing.assert_array_equal(args[6], mcolors.to_rgba_array(["r", "b"], 0.3))
+    np.testing.assert_array_equal(args[7], mcolors.to_rgba_array(["k", "k"], 0.3))
+
+    # and so it is drawn, the triangle in light red
+    canvas = axes.figure.canvas
+    x, y = axes.axes.transData.transform([1.25, 1.25])
+    pixels = np.asarray(canvas.buffer_rgba())
+    np.testing.assert_allclose(
+        pixels[int(pixels.shape[0] - y), int(x)], [255, 178, 178, 255], atol=1
+    )
+
+
+def test_scalar_styles_broadcast(axes):
+    draw = _draw_collection(
+        axes,
+        x=_X,
+        y=_Y,
+        lengths=np.array([3, 4]),
+        facecolor="r",
+        linewidth=2.0,
+        linestyle="--",
+    )
+    args = draw.call_args.args
+    np.testing.assert_array_equal(args[6], mcolors.to_rgba_array(["r", "r"]))
+    # the default
+    np.testing.assert_array_equal(args[7], mcolors.to_rgba_array(["C0", "C0"]))
+    np.testing.assert_array_equal(args[8], [2.0, 2.0])
+    # the dashes are scaled to each width
+    assert args[9][0] == args[9][1]
+    assert args[9][0][1] is not None
+
+
+def test_codes_split(axes):
+    codes = np.array(
+        [Path.MOVETO, Path.LINETO, Path.CLOSEPOLY]
+        + [Path.MOVETO, Path.LINETO, Path.LINETO, Path.CLOSEPOLY]
+    )
+    draw = _draw_collection(axes, x=_X, y=_Y, codes=codes, lengths=np.array([3, 4]))
+    paths = draw.call_args.args[2]
+    np.testing.assert_array_equal(paths[0].codes, codes[:3])
+    np.testing.assert_array_equal(paths[1].codes, codes[3:])
+
+
+def test_no_paths(axes):
+    draw = _draw_collection(
+        axes, x=np.array([]), y=np.array([]), lengths=np.array([], dtype=int)
+    )
+    draw.assert_not_called()
+
+
+def _placed_paths(axes, artist):
+    """The data space paths of the shapes drawn by *artist*."""
+    axes.add_artist(artist)
+    renderer = axes.figure.canvas.get_renderer()
+    with mock.patch.object(
+        renderer, "draw_path_collection", wraps=renderer.draw_path_collection
+    ) as draw:
+        axes.figure.canvas.draw()
+    inverse = axes.axes.transData.inverted()
+    return [inverse.transform(p.vertices) for p in draw.call_args.args[2]]
+
+
+def test_rectangles_broadcast(axes):
+    paths = _placed_paths(
+        axes,
+        Rectangle(
+            ArrayContainer(
+                lower_left_x=np.array([1.0, 3.0, 5.0]),
+                lower_left_y=np.array(0.0),
+                upper_right_x=np.array([2.0, 4.0, 6.0]),
+                upper_right_y=np.array([1.0, 2.0, 3.0]),
+            )
+        ),
+    )
+    assert len(paths) == 3
+    for path, x, top in zip(paths, [1, 3, 5], [1, 2, 3]):
+        np.testing.assert_allclose(
+            path[:4], [[x, 0], [x + 1, 0], [x + 1, top], [x, top]], atol=1e-12
+        )
+
+
+def test_rectangles_rotated(axes):
+    paths = _placed_paths(
+        axes,
+        Rectangle(
+            ArrayContainer(
+                lower_left_x=np.array([1.0, 5.0]),
+                lower_left_y=np.array(1.0),
+                upper_right_x=np.array([3.0, 7.0]),
+                upper_right_y=np.array(2.0),
+                angle=np.array([0.0, 90.0]),
+                rotation_point_x=np.array([1.0, 5.0]),
+                rotation_point_y=np.array(1.0),
+            )
+        ),
+    )
+    np.testing.assert_allclose(paths[0][:4], [[1, 1], [3, 1], [3, 2], [1, 2]])
+    # turned about its lower left corner
+    np.testing.assert_allclose(
+        paths[1][:4], [[5, 1], [5, 3], [4, 3], [4, 1]], atol=1e-12
+    )
+
+
+def test_regular_polygons_broadcast(axes):
+    paths = _placed_paths(
+        axes,
+        RegularPolygon(
+            ArrayContainer(
+                center_x=np.array([2.0, 6.0]),
+                center_y=np.array(5.0),
+                radius=np.array([1.0, 2.0]),
+                num_vertices=np.array(4),
+            )
+        ),
+    )
+    assert len(paths) == 2
+    for path, cx, r in zip(paths, [2, 6], [1, 2]):
+        # the unit square (corners up) scaled and moved to the center
+        np.testing.assert_allclose(
+            path[:4], [[cx, 5 + r], [cx - r, 5], [cx, 5 - r], [cx + r, 5]], atol=1e-12
+        )
+
+
+def test_overlapping_shapes_filled(axes):
+    # the second is mirrored, so wound the other way around
+    axes.add_artist(
+        Rectangle(
+            ArrayContainer(
+                lower_left_x=np.array([2.0, 6.0]),
+                lower_left_y=np.array([2.0, 4.0]),
+                upper_right_x=np.array([6.0, 4.0]),
+                upper_right_y=np.array(6.0),
+            ),
+            facecolor="r",
+            edgecolor="r",
+        )
+    )
+    canvas = axes.figure.canvas
+    canvas.draw()
+    x, y = axes.axes.transData.transform([5.0, 5.0])
+    pixels = np.asarray(canvas.buffer_rgba())
+    np.testing.assert_array_equal(
+        pixels[int(pixels.shape[0] - y), int(x)], [255, 0, 0, 255]
+    )
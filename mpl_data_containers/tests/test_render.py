@@ -0,0 +1,54 @@
+import io
+import pickle
+
+import numpy as np
+
+import matplotlib.image as mimage
+
+from ..containers import ArrayContainer
+from ..line import Line
+from ..render import FigureSpec, _SharedArrays, render_figure, render_many
+from ..wrappers import LineWrapper
+
+
+def _build(data, linewidth=1):
+    return [Line(data, linewidth=linewidth), LineWrapper(data, color="k")]
+
+
+def _specs():
+    x = np.linspace(0, 10, 20_000)
+    data = ArrayContainer(x=x, y=np.sin(x) + 5)
+    return [
+        FigureSpec(_build, {"data": data}, xlim=(0, 10), ylim=(0, 10), dpi=50)
+        for _ in range(3)
+    ]
+
+
+def test_render_figure():
+    png = render_figure(_specs()[0])
+    image = mimage.imread(io.BytesIO(png))
+    assert image.shape == (240, 320, 4)
+    assert (image[..., :3] < 1).any()
+
+
+def test_render_many():
+    specs = _specs()
+    expected = [mimage.imread(io.BytesIO(render_figure(s))) for s in specs]
+    pngs = render_many(specs, max_workers=2)
+    assert len(pngs) == len(specs)
+    for png, image in zip(pngs, expected):
+        np.testing.assert_array_equal(mimage.imread(io.BytesIO(png)), image)
+
+
+def test_large_arrays_shared(tmp_path):
+    small = np.arange(10.0)
+    large = np.arange(100_000.0)
+    shared = _SharedArrays(str(tmp_path))
+    payloads = [shared.dumps({"small": small, "large": large}) for _ in range(2)]
+
+    assert len(list(tmp_path.iterdir())) == 1
+    assert len(payloads[0]) < large.nbytes
+    loaded = pickle.loads(payloads[0])
+    np.testing.assert_array_equal(loaded["small"], small)
+    np.testing.assert_array_equal(loaded["large"], large)
+    assert not loaded["large"].flags.writeable
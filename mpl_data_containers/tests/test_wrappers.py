@@ -0,0 +1,127 @@
+import numpy as np
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..containers import ArrayContainer, SharedArrayContainer
+from ..conversion_node import FunctionConversionNode
+from ..description import Desc, desc_like
+from ..wrappers import LineWrapper
+
+
+class _LimitsContainer:
+    """The data limits of the axes, under a fixed cache key."""
+
+    def describe(self):
+        return {"x": Desc(("N",)), "y": Desc(("N",))}
+
+    def query(self, graph, parent_coordinates="axes"):
+        xy = {"x": Desc(("N",), "data"), "y": Desc(("N",), "data")}
+        data_lim = graph.evaluator(
+            xy, desc_like(xy, coordinates=parent_coordinates)
+        ).inverse
+        return data_lim.evaluate({"x": (0, 1), "y": (0, 1)}), "fixed"
+
+
+def _axes_and_line(data, converters=None):
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    line = LineWrapper(data, converters)
+    ax.add_artist(line)
+    return ax, line
+
+
+def test_transform_invalidates_cache():
+    ax, line = _axes_and_line(_LimitsContainer())
+    ax.set_xlim(0, 1)
+    renderer = ax.figure.canvas.get_renderer()
+    np.testing.assert_allclose(line._query_and_transform(renderer)["xdata"], [0, 1])
+    ax.set_xlim(0, 2)
+    np.testing.assert_allclose(line._query_and_transform(renderer)["xdata"], [0, 2])
+
+
+def test_limits_changed_twice():
+    ax, line = _axes_and_line(_LimitsContainer())
+    ax.set_xlim(0, 1)
+    renderer = ax.figure.canvas.get_renderer()
+    np.testing.assert_allclose(line._query_and_transform(renderer)["xdata"], [0, 1])
+    # without querying in between
+    ax.set_xlim(0, 2)
+    ax.set_xlim(0, 3)
+    np.testing.assert_allclose(line._query_and_transform(renderer)["xdata"], [0, 3])
+    ax.set_xlim(0, 4)
+    ax.set_xlim(0, 1)
+    np.testing.assert_allclose(line._query_and_transform(renderer)["xdata"], [0, 1])
+
+
+def test_static_data_cached():
+    calls = []
+
+    def double(y):
+        calls.append(y)
+        return {"y": 2 * y}
+
+    x = np.linspace(0, 1, 10)
+    ax, line = _axes_and_line(
+        ArrayContainer(x=x, y=x), [FunctionConversionNode.from_funcs({"y": double})]
+    )
+    renderer = ax.figure.canvas.get_renderer()
+    graph = line._get_graph(ax)
+    first = line._query_and_transform(renderer)
+    assert line._query_and_transform(renderer) is first
+    assert line._get_graph(ax) is graph
+    assert len(calls) == 1
+
+    line._converters.insert(0, FunctionConversionNode.from_funcs({"x": lambda x: x}))
+    line._query_and_transform(renderer)
+    assert len(calls) == 2
+
+
+def test_unchanged_inputs_not_converted():
+    calls = []
+
+    def to_marker(marker):
+        calls.append(marker)
+        return marker.upper()
+
+    x = np.linspace(0, 1, 10)
+    cont = ArrayContainer(x=x, y=x, marker="x")
+    ax, line = _axes_and_line(
+        cont, [FunctionConversionNode.from_funcs({"marker": to_marker})]
+    )
+    renderer = ax.figure.canvas.get_renderer()
+    line._query_and_transform(renderer)
+    cont.update(y=2 * x)
+    np.testing.assert_array_equal(line._query_and_transform(renderer)["ydata"], 2 * x)
+    assert calls == ["x"]
+
+
+def test_updated_in_place_converted():
+    x = np.linspace(0, 1, 10)
+    y = x.copy()
+    cont = ArrayContainer(x=x, y=y)
+    ax, line = _axes_and_line(
+        cont, [FunctionConversionNode.from_funcs({"y": lambda y: y + 1})]
+    )
+    renderer = ax.figure.canvas.get_renderer()
+    np.testing.assert_array_equal(line._query_and_transform(renderer)["ydata"], x + 1)
+    y *= 2
+    cont.update(y=y)
+    np.testing.assert_array_equal(
+        line._query_and_transform(renderer)["ydata"], 2 * x + 1
+    )
+
+
+def test_shared_container_converted():
+    x = np.linspace(0, 1, 10)
+    cont = SharedArrayContainer(x=x, y=x)
+    ax, line = _axes_and_line(
+        cont, [FunctionConversionNode.from_funcs({"y": lambda y: y + 1})]
+    )
+    renderer = ax.figure.canvas.get_renderer()
+    np.testing.assert_array_equal(line._query_and_transform(renderer)["ydata"], x + 1)
+    cont.update(y=x * 2)
+    np.testing.assert_array_equal(
+        line._query_and_transform(renderer)["ydata"], 2 * x + 1
+    )
@@ -26,9 +26,7 @@ class Text(Artist):
 
         self._graph = self._graph + Graph(edges)
 
-    def draw(self, renderer, graph: Graph) -> None:
-        if not self.get_visible():
-            return
+    def _prepare(self, graph: Graph, queried=None):
         g = graph + self._graph
         conv = g.evaluator(
             self._container.describe(),
@@ -51,8 +49,11 @@ class Text(Artist):
             },
         )
 
-        query, _ = self._container.query(g)
-        evald = conv.evaluate(query)
+        query, _ = queried or self._container.query(g)
+        return [(conv, query)]
+
+    def _emit(self, renderer, graph, evaluated):
+        (evald,) = evaluated
 
         text = evald["text"]
         if text == "":
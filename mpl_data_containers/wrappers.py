@@ -1,5 +1,6 @@
 from typing import Dict, Any, Protocol, Tuple, get_type_hints
 import inspect
+import threading
 
 import numpy as np
 
@@ -18,13 +19,17 @@ from matplotlib.collections import (
 )
 from matplotlib.artist import Artist as _Artist
 
-from mpl_data_containers.containers import DataContainer, _MatplotlibTransform
+from mpl_data_containers.containers import (
+    DataContainer,
+    _MatplotlibTransform,
+    query_versions,
+)
 from mpl_data_containers.description import Desc, desc_like
 from mpl_data_containers.conversion_edge import TransformEdge, Graph
 from mpl_data_containers.conversion_node import (
     ConversionNode,
     RenameConversionNode,
-    evaluate_pipeline,
+    compile_pipeline,
     FunctionConversionNode,
     LimitKeysConversionNode,
 )
@@ -123,15 +128,44 @@ class ProxyWrapperBase:
         """
         Helper to centralize the data querying and python-side transforms
 
+        The result is cached on the key of the queried data, the versions of the
+        axes transforms and the version of the converters.
+
         Parameters
         ----------
         renderer : RendererBase
         """
         # extract what we need to about the axes to query the data
         ax = self.axes
+        graph = self._get_graph(ax)
 
         # actually query the underlying data.  This returns both the (raw) data
         # and key to use for caching.
+        data, data_key, versions = query_versions(self.data, graph, "axes")
+        converters_version = self._converters_version()
+        cache_key = (data_key, graph.transform_key(), converters_version)
+        # see if we can short-circuit
+        with self._cache_lock:
+            try:
+                return self._cache[cache_key]
+            except KeyError:
+                ...
+        delayed_conversion = {
+            "xunits": ax.xaxis.convert_units,
+            "yunits": ax.yaxis.convert_units,
+        }
+        pipeline = self._get_pipeline(converters_version, tuple(data))
+        transformed_data = pipeline.evaluate(data, delayed_conversion, versions)
+
+        with self._cache_lock:
+            self._cache[cache_key] = transformed_data
+        return transformed_data
+
+    def _get_graph(self, ax: _Axes) -> Graph:
+        """The graph to query the data with, rebuilt only when the axes change."""
+        graph_ax, graph = self._query_graph
+        if graph_ax is ax:
+            return graph
         desc = Desc(("N",), coordinates="data")
         xy = {"x": desc, "y": desc}
         edges = [
@@ -149,20 +183,28 @@ class ProxyWrapperBase:
             ),
         ]
         graph = Graph(edges)
-        data, cache_key = self.data.query(graph, "axes")
-        # see if we can short-circuit
-        try:
-            return self._cache[cache_key]
-        except KeyError:
-            ...
-        delayed_conversion = {
-            "xunits": ax.xaxis.convert_units,
-            "yunits": ax.yaxis.convert_units,
-        }
-        transformed_data = evaluate_pipeline(self._converters, data, delayed_conversion)
-
-        self._cache[cache_key] = transformed_data
-        return transformed_data
+        self._query_graph = (ax, graph)
+        return graph
+
+    def _converters_version(self) -> int:
+        """A version bumped whenever the list of converters is changed."""
+        seen, version = self._converters_seen
+        converters = self._converters
+        if len(seen) != len(converters) or any(
+            a is not b for a, b in zip(seen, converters)
+        ):
+            # (holding on to the old converters keeps their identities unique)
+            version += 1
+            self._converters_seen = (tuple(converters), version)
+        return version
+
+    def _get_pipeline(self, version: int, input_keys: tuple[str, ...]):
+        """The converters compiled for *input_keys*, recompiled when they change."""
+        pipeline_version, pipeline = self._pipeline
+        if pipeline_version != version or pipeline.input_keys != input_keys:
+            pipeline = compile_pipeline(self._converters, input_keys)
+            self._pipeline = (version, pipeline)
+        return pipeline
 
     def __init__(
         self, data, converters: ConversionNode | list[ConversionNode] | None, **kwargs
@@ -170,10 +212,13 @@ class ProxyWrapperBase:
         super().__init__(**kwargs)
         self.data = data
         self._cache = LFUCache(64)
-        # TODO make sure mutating this will invalidate the cache!
+        self._cache_lock = threading.Lock()
+        self._query_graph = (None, None)
         if isinstance(converters, ConversionNode):
             converters = [converters]
         self._converters: list[ConversionNode] = converters or []
+        self._converters_seen = ((), 0)
+        self._pipeline = (None, None)
         setters = list(self.expected_keys | self.required_keys)
         if hasattr(self, "_wrapped_class"):
             setters += [f[4:] for f in dir(self._wrapped_class) if f.startswith("set_")]
@@ -198,7 +243,11 @@ class ProxyWrapper(ProxyWrapperBase):
             "_wrapped_instance",
             "data",
             "_cache",
+            "_cache_lock",
             "_converters",
+            "_converters_seen",
+            "_pipeline",
+            "_query_graph",
             "stale",
             "_sigs",
         ):